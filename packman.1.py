@@ -2,6 +2,8 @@ import pygame
 import sys
 import random
 
+from packman_engine import MazeTable, DIR_BIT, DIR_INDEX, MASK_DIRS
+
 # Initialize Pygame
 pygame.init()
 
@@ -43,6 +45,16 @@ MAZE = [
     "###################",
 ]
 
+# Legal moves per cell, compiled once
+maze_table = MazeTable(MAZE)
+
+# Spawn cells; both must be open corridor or the character can never move
+PACMAN_START = (9, 13)
+GHOST_START = (9, 5)
+for spawn in (PACMAN_START, GHOST_START):
+    if not maze_table.walkable[maze_table.cell(*spawn)]:
+        raise ValueError(f"spawn {spawn} is inside a wall")
+
 # Initialize screen
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Pac-Man")
@@ -62,8 +74,8 @@ for y, row in enumerate(MAZE):
 
 # Initialize Pac-Man
 pacman = {
-    "grid_x": 9,
-    "grid_y": 15,
+    "grid_x": PACMAN_START[0],
+    "grid_y": PACMAN_START[1],
     "progress": 0,
     "direction": (0, 0),
     "next_dir": (0, 0),
@@ -72,36 +84,28 @@ pacman = {
 
 # Initialize Ghost
 ghost = {
-    "grid_x": 9,
-    "grid_y": 5,
+    "grid_x": GHOST_START[0],
+    "grid_y": GHOST_START[1],
     "progress": 0,
     "direction": (0, 0),
     "speed": 2,
     "next_dir": (0, 0)
 }
 
-def move_character(character, maze):
+def move_character(character, table):
     if character["direction"] != (0, 0):
         character["progress"] += character["speed"] / CELL_SIZE
         
         if character["progress"] >= 1:
             overflow = character["progress"] - 1
-            character["grid_x"] += character["direction"][0]
-            character["grid_y"] += character["direction"][1]
+            cell = table.cell(character["grid_x"], character["grid_y"])
+            # Tunnel wrap-around is already folded into the neighbor table
+            cell = table.neighbors[cell * 4 + DIR_INDEX[character["direction"]]]
+            character["grid_y"], character["grid_x"] = divmod(cell, table.width)
             character["progress"] = overflow
-            
-            # Handle tunnel wrap-around
-            if character["grid_x"] < 0:
-                character["grid_x"] = len(maze[0]) - 1
-            elif character["grid_x"] >= len(maze[0]):
-                character["grid_x"] = 0
 
             # Check next direction
-            next_x = character["grid_x"] + character["direction"][0]
-            next_y = character["grid_y"] + character["direction"][1]
-            
-            if not (0 <= next_x < len(maze[0]) and 0 <= next_y < len(maze)) or \
-               maze[next_y][next_x] == "#":
+            if not table.moves[cell] & DIR_BIT[character["direction"]]:
                 character["direction"] = (0, 0)
 
 def handle_pacman_input():
@@ -121,38 +125,25 @@ def handle_pacman_input():
             elif event.key == pygame.K_DOWN:
                 new_dir = (0, 1)
             
-            if new_dir:
-                next_x = pacman["grid_x"] + new_dir[0]
-                next_y = pacman["grid_y"] + new_dir[1]
-                
-                if 0 <= next_x < len(MAZE[0]) and 0 <= next_y < len(MAZE):
-                    if MAZE[next_y][next_x] != "#":
-                        if pacman["progress"] == 0:
-                            pacman["direction"] = new_dir
-                        else:
-                            pacman["next_dir"] = new_dir
+            if new_dir and maze_table.can_move(pacman["grid_x"], pacman["grid_y"], new_dir):
+                if pacman["progress"] == 0:
+                    pacman["direction"] = new_dir
+                else:
+                    pacman["next_dir"] = new_dir
 
 def move_ghost():
-    directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-    
     if ghost["progress"] == 0:
-        possible_dirs = []
         current_dir = ghost["direction"]
-        
-        for dx, dy in directions:
-            new_x = ghost["grid_x"] + dx
-            new_y = ghost["grid_y"] + dy
-            
-            if 0 <= new_x < len(MAZE[0]) and 0 <= new_y < len(MAZE):
-                if MAZE[new_y][new_x] != "#" and (dx, dy) != (-current_dir[0], -current_dir[1]):
-                    possible_dirs.append((dx, dy))
+        reverse = DIR_BIT[(-current_dir[0], -current_dir[1])]
+        cell = maze_table.cell(ghost["grid_x"], ghost["grid_y"])
+        possible_dirs = MASK_DIRS[maze_table.moves[cell] & ~reverse]
         
         if possible_dirs:
             ghost["direction"] = random.choice(possible_dirs)
         else:
             ghost["direction"] = (0, 0)
     
-    move_character(ghost, MAZE)
+    move_character(ghost, maze_table)
 
 def check_collisions():
     global score, lives
@@ -162,6 +153,7 @@ def check_collisions():
     py = pacman["grid_y"]
     if dots[py][px]:
         dots[py][px] = False
+        eaten_cells.append((px, py))
         score += 10
     
     # Ghost collision
@@ -185,62 +177,100 @@ def check_collisions():
         else:
             # Reset positions
             pacman.update({
-                "grid_x": 9, "grid_y": 15,
+                "grid_x": PACMAN_START[0], "grid_y": PACMAN_START[1],
                 "progress": 0, "direction": (0, 0),
                 "next_dir": (0, 0)
             })
             ghost.update({
-                "grid_x": 9, "grid_y": 5,
+                "grid_x": GHOST_START[0], "grid_y": GHOST_START[1],
                 "progress": 0, "direction": (0, 0)
             })
 
-def draw():
-    screen.fill(BLACK)
-    
-    # Draw maze
-    for y in range(len(MAZE)):
-        for x in range(len(MAZE[y])):
-            if MAZE[y][x] == "#":
-                pygame.draw.rect(screen, BLUE, 
-                               (x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE))
-            if dots[y][x]:
-                center = (x*CELL_SIZE + CELL_SIZE//2, y*CELL_SIZE + CELL_SIZE//2)
-                pygame.draw.circle(screen, WHITE, center, 3)
-    
-    # Draw Pac-Man
+def sprite_rects():
     px = (pacman["grid_x"] + pacman["direction"][0] * pacman["progress"]) * CELL_SIZE
     py = (pacman["grid_y"] + pacman["direction"][1] * pacman["progress"]) * CELL_SIZE
-    pygame.draw.circle(screen, YELLOW, (px + CELL_SIZE//2, py + CELL_SIZE//2), CELL_SIZE//2 - 2)
-    
-    # Draw Ghost (fixed syntax error here)
     gx = (ghost["grid_x"] + ghost["direction"][0] * ghost["progress"]) * CELL_SIZE
     gy = (ghost["grid_y"] + ghost["direction"][1] * ghost["progress"]) * CELL_SIZE
-    pygame.draw.rect(screen, RED, (gx, gy, CELL_SIZE, CELL_SIZE))
+    return pygame.Rect(px, py, CELL_SIZE, CELL_SIZE), pygame.Rect(gx, gy, CELL_SIZE, CELL_SIZE)
+
+# Pre-bake the walls once; the board surface holds walls plus remaining dots
+background = pygame.Surface((WIDTH, HEIGHT))
+background.fill(BLACK)
+for y in range(len(MAZE)):
+    for x in range(len(MAZE[y])):
+        if MAZE[y][x] == "#":
+            pygame.draw.rect(background, BLUE,
+                           (x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE))
+background = background.convert()
+
+board = background.copy()
+for y in range(len(MAZE)):
+    for x in range(len(MAZE[y])):
+        if dots[y][x]:
+            center = (x*CELL_SIZE + CELL_SIZE//2, y*CELL_SIZE + CELL_SIZE//2)
+            pygame.draw.circle(board, WHITE, center, 3)
+
+font = pygame.font.Font(None, 36)
+hud_rect = pygame.Rect(0, HEIGHT - 60, WIDTH, 60)
+eaten_cells = []
+last_rects = []
+hud_state = None
+
+def draw():
+    # Dirty-rectangle redraw: repaint only eaten dots, the sprites' old and
+    # new rects and the HUD when it changes, then push just those regions
+    global last_rects, hud_state
+    if not last_rects:
+        screen.blit(board, (0, 0))
+        dirty = [screen.get_rect()]
+    else:
+        dirty = []
+
+    # Erase eaten dots from the board
+    for x, y in eaten_cells:
+        cell = pygame.Rect(x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE)
+        board.blit(background, cell, cell)
+        dirty.append(cell)
+    eaten_cells.clear()
+
+    # Erase sprites at their old positions
+    dirty.extend(last_rects)
+    for rect in dirty:
+        screen.blit(board, rect, rect)
+    
+    # Draw Pac-Man
+    pac_rect, ghost_rect = sprite_rects()
+    pygame.draw.circle(screen, YELLOW, pac_rect.center, CELL_SIZE//2 - 2)
+    
+    # Draw Ghost
+    pygame.draw.rect(screen, RED, ghost_rect)
+    last_rects = [pac_rect, ghost_rect]
+    dirty.extend(last_rects)
     
     # Draw UI
-    font = pygame.font.Font(None, 36)
-    score_text = font.render(f"Score: {score}", True, WHITE)
-    lives_text = font.render(f"Lives: {lives}", True, WHITE)
-    screen.blit(score_text, (10, HEIGHT - 50))
-    screen.blit(lives_text, (WIDTH - 120, HEIGHT - 50))
+    if hud_state != (score, lives):
+        hud_state = (score, lives)
+        screen.blit(board, hud_rect, hud_rect)
+        score_text = font.render(f"Score: {score}", True, WHITE)
+        lives_text = font.render(f"Lives: {lives}", True, WHITE)
+        screen.blit(score_text, (10, HEIGHT - 50))
+        screen.blit(lives_text, (WIDTH - 120, HEIGHT - 50))
+        dirty.append(hud_rect)
     
-    pygame.display.flip()
+    pygame.display.update(dirty)
 
 # Main game loop
 while True:
     handle_pacman_input()
-    move_character(pacman, MAZE)
+    move_character(pacman, maze_table)
     move_ghost()
     check_collisions()
     
     # Check queued direction for Pac-Man
     if pacman["next_dir"] != (0, 0) and pacman["progress"] == 0:
-        next_x = pacman["grid_x"] + pacman["next_dir"][0]
-        next_y = pacman["grid_y"] + pacman["next_dir"][1]
-        if 0 <= next_x < len(MAZE[0]) and 0 <= next_y < len(MAZE):
-            if MAZE[next_y][next_x] != "#":
-                pacman["direction"] = pacman["next_dir"]
-                pacman["next_dir"] = (0, 0)
+        if maze_table.can_move(pacman["grid_x"], pacman["grid_y"], pacman["next_dir"]):
+            pacman["direction"] = pacman["next_dir"]
+            pacman["next_dir"] = (0, 0)
     
     draw()
     clock.tick(FPS)
@@ -1,17 +1,20 @@
+import argparse
 import pygame
 import sys
-import random
+import time
+from collections import OrderedDict
 
-# Initialize Pygame
-pygame.init()
+from packman_autopilot import Autopilot
+from packman_engine import PacmanEngine, CELL_SIZE, FPS, MAZE, UP, DOWN, LEFT, RIGHT
+from packman_level import load_level
+from packman_mazegen import generate_maze
+from packman_replay import Recorder
 
 # Game constants
-CELL_SIZE = 30
 MAZE_WIDTH = 19
 MAZE_HEIGHT = 21
 WIDTH = CELL_SIZE * MAZE_WIDTH
 HEIGHT = CELL_SIZE * MAZE_HEIGHT + 60
-FPS = 60
 
 # Colors
 BLACK = (0, 0, 0)
@@ -21,284 +24,365 @@ BLUE = (0, 0, 255)
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 
-# Corrected maze layout (fixed central corridor)
-MAZE = [
-    "###################",
-    "#........#........#",
-    "# ### ## # ## ### #",
-    "# ### ## # ## ### #",
-    "# ### ## # ## ### #",
-    "#.................#",
-    "# ### # ### # ### #",
-    "# ### # ### # ### #",
-    "#     #     #     #",
-    "###################",
-    "#     #     #     #",  # Row 9
-    "# ### # ### # ### #",
-    "# ### # ### # ### #",
-    "#.................#",
-    "# ### ## # ## ### #",
-    "# ### ## # ## ### #",
-    "# ### ## # ## ### #",
-    "#.................#",  # Row 17 - open corridor
-    "###################",
-]
-
-def reset_game():
-    global score, lives, dots, pacman, ghost, game_over
-    score = 0
-    lives = 3
-    game_over = False
-    
-    # Reset dots
-    for y in range(len(MAZE)):
-        for x in range(len(MAZE[y])):
-            dots[y][x] = MAZE[y][x] in ('.', ' ')
-    
-    # Reset characters with valid starting positions
-    pacman.update({
-        "grid_x": 9,  # Center of open corridor
-        "grid_y": 17, # Row 17 (now open)
-        "progress": 0,
-        "direction": (0, 0),
-        "next_dir": (0, 0)
-    })
-    ghost.update({
-        "grid_x": 9,
-        "grid_y": 5,
-        "progress": 0,
-        "direction": (0, 0)
-    })
-
-# Initialize screen
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Pac-Man")
-clock = pygame.time.Clock()
-
-# Game state
-score = 0
-lives = 3
-game_over = False
-
-# Initialize dots
-dots = []
-for y, row in enumerate(MAZE):
-    dot_row = []
-    for x, char in enumerate(row):
-        dot_row.append(char in ('.', ' '))
-    dots.append(dot_row)
-
-# Initialize Pac-Man with valid starting position
-pacman = {
-    "grid_x": 9,
-    "grid_y": 17,
-    "progress": 0,
-    "direction": (0, 0),
-    "next_dir": (0, 0),
-    "speed": 3
-}
-
-# Initialize Ghost
-ghost = {
-    "grid_x": 9,
-    "grid_y": 5,
-    "progress": 0,
-    "direction": (0, 0),
-    "speed": 2,
-    "next_dir": (0, 0)
-}
-
-def move_character(character, maze):
-    if character["direction"] != (0, 0):
-        character["progress"] += character["speed"] / CELL_SIZE
-        
-        if character["progress"] >= 1:
-            overflow = character["progress"] - 1
-            new_x = character["grid_x"] + character["direction"][0]
-            new_y = character["grid_y"] + character["direction"][1]
-            
-            # Check if new position is valid before moving
-            if 0 <= new_x < len(maze[0]) and 0 <= new_y < len(maze):
-                if maze[new_y][new_x] != "#":
-                    character["grid_x"] = new_x
-                    character["grid_y"] = new_y
-                    character["progress"] = overflow
-                else:
-                    character["direction"] = (0, 0)
-                    character["progress"] = 0
-            else:
-                # Handle tunnel wrap-around
-                if new_x < 0:
-                    character["grid_x"] = len(maze[0]) - 1
-                elif new_x >= len(maze[0]):
-                    character["grid_x"] = 0
-                else:
-                    character["direction"] = (0, 0)
-                    character["progress"] = 0
+# Scrolling renderer tiles: cells per chunk side and how many baked chunks to keep
+CHUNK_CELLS = 16
+CHUNK_CACHE = 64
+
 
 def handle_pacman_input():
     keys = pygame.key.get_pressed()
     new_dir = None
-    
+
     if keys[pygame.K_LEFT]:
-        new_dir = (-1, 0)
+        new_dir = LEFT
     elif keys[pygame.K_RIGHT]:
-        new_dir = (1, 0)
+        new_dir = RIGHT
     elif keys[pygame.K_UP]:
-        new_dir = (0, -1)
+        new_dir = UP
     elif keys[pygame.K_DOWN]:
-        new_dir = (0, 1)
-    
-    if keys[pygame.K_r] and game_over:
-        reset_game()
-
-    if new_dir and not game_over:
-        # Check if we can change direction immediately
-        if pacman["progress"] == 0:
-            next_x = pacman["grid_x"] + new_dir[0]
-            next_y = pacman["grid_y"] + new_dir[1]
-            if 0 <= next_x < len(MAZE[0]) and 0 <= next_y < len(MAZE):
-                if MAZE[next_y][next_x] != "#":
-                    pacman["direction"] = new_dir
-        else:
-            # Queue direction change for next intersection
-            pacman["next_dir"] = new_dir
-
-def move_ghost():
-    if game_over:
-        return
-    
-    directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-    
-    if ghost["progress"] == 0:
-        possible_dirs = []
-        current_dir = ghost["direction"]
-        
-        for dx, dy in directions:
-            new_x = ghost["grid_x"] + dx
-            new_y = ghost["grid_y"] + dy
-            
-            if 0 <= new_x < len(MAZE[0]) and 0 <= new_y < len(MAZE):
-                if MAZE[new_y][new_x] != "#" and (dx, dy) != (-current_dir[0], -current_dir[1]):
-                    possible_dirs.append((dx, dy))
-        
-        if possible_dirs:
-            ghost["direction"] = random.choice(possible_dirs)
-        else:
-            ghost["direction"] = (0, 0)
-    
-    move_character(ghost, MAZE)
-
-def check_collisions():
-    global score, lives, game_over
-    
-    if game_over:
-        return
-    
-    # Check dot collection
-    px = pacman["grid_x"]
-    py = pacman["grid_y"]
-    if dots[py][px]:
-        dots[py][px] = False
-        score += 10
-    
-    # Ghost collision
-    pac_rect = pygame.Rect(
-        (pacman["grid_x"] + pacman["direction"][0] * pacman["progress"]) * CELL_SIZE,
-        (pacman["grid_y"] + pacman["direction"][1] * pacman["progress"]) * CELL_SIZE,
-        CELL_SIZE, CELL_SIZE
-    )
-    
-    ghost_rect = pygame.Rect(
-        (ghost["grid_x"] + ghost["direction"][0] * ghost["progress"]) * CELL_SIZE,
-        (ghost["grid_y"] + ghost["direction"][1] * ghost["progress"]) * CELL_SIZE,
-        CELL_SIZE, CELL_SIZE
-    )
-    
-    if pac_rect.colliderect(ghost_rect):
-        lives -= 1
-        if lives <= 0:
-            game_over = True
+        new_dir = DOWN
+
+    return new_dir, keys[pygame.K_r]
+
+
+def sprite_positions(engine):
+    # Pixel positions of every ghost, then Pac-Man
+    positions = [engine.ghost_pixel_pos(i) for i in range(engine.num_ghosts)]
+    positions.append(engine.pacman.pixel_pos())
+    return positions
+
+
+def interpolate(previous, current, alpha):
+    # Blend between the last two simulation states; anything that jumped more
+    # than a cell (respawn, tunnel wrap) snaps straight to its new position
+    if len(previous) != len(current):
+        return current
+    blended = []
+    for (x0, y0), (x1, y1) in zip(previous, current):
+        if abs(x1 - x0) > CELL_SIZE or abs(y1 - y0) > CELL_SIZE:
+            blended.append((x1, y1))
         else:
-            # Reset positions
-            pacman.update({
-                "grid_x": 9, "grid_y": 17,
-                "progress": 0, "direction": (0, 0),
-                "next_dir": (0, 0)
-            })
-            ghost.update({
-                "grid_x": 9, "grid_y": 5,
-                "progress": 0, "direction": (0, 0)
-            })
-
-def draw():
-    screen.fill(BLACK)
-    
-    # Draw maze
-    for y in range(len(MAZE)):
-        for x in range(len(MAZE[y])):
-            if MAZE[y][x] == "#":
-                pygame.draw.rect(screen, BLUE, 
-                               (x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE))
-            if dots[y][x]:
-                center = (x*CELL_SIZE + CELL_SIZE//2, y*CELL_SIZE + CELL_SIZE//2)
-                pygame.draw.circle(screen, WHITE, center, 3)
-    
-    # Draw Pac-Man
-    if not game_over:
-        px = (pacman["grid_x"] + pacman["direction"][0] * pacman["progress"]) * CELL_SIZE
-        py = (pacman["grid_y"] + pacman["direction"][1] * pacman["progress"]) * CELL_SIZE
-        pygame.draw.circle(screen, YELLOW, (px + CELL_SIZE//2, py + CELL_SIZE//2), CELL_SIZE//2 - 2)
-    
-    # Draw Ghost
-    gx = (ghost["grid_x"] + ghost["direction"][0] * ghost["progress"]) * CELL_SIZE
-    gy = (ghost["grid_y"] + ghost["direction"][1] * ghost["progress"]) * CELL_SIZE
-    pygame.draw.rect(screen, RED, (gx, gy, CELL_SIZE, CELL_SIZE))
-    
-    # Draw UI
-    font = pygame.font.Font(None, 36)
-    score_text = font.render(f"Score: {score}", True, WHITE)
-    lives_text = font.render(f"Lives: {lives}", True, WHITE)
-    screen.blit(score_text, (10, HEIGHT - 50))
-    screen.blit(lives_text, (WIDTH - 120, HEIGHT - 50))
-    
-    # Draw game over screen
-    if game_over:
+            blended.append((round(x0 + (x1 - x0) * alpha), round(y0 + (y1 - y0) * alpha)))
+    return blended
+
+
+class Renderer:
+    # Walls are baked once into a converted background surface and dots live
+    # on a persistent board surface. Each frame only the sprite rects, eaten
+    # dot cells and a changed HUD are repainted and pushed with
+    # pygame.display.update(rects); everything else stays on screen.
+    def __init__(self, screen, font):
+        self.screen = screen
+        self.font = font
+        self.background = self.bake_background()
+        self.board = None
+        self.invalidate()
+
+    def bake_background(self):
+        background = pygame.Surface((WIDTH, HEIGHT))
+        background.fill(BLACK)
+        for y in range(len(MAZE)):
+            for x in range(len(MAZE[y])):
+                if MAZE[y][x] == "#":
+                    pygame.draw.rect(background, BLUE,
+                                   (x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE))
+        return background.convert()
+
+    def invalidate(self):
+        # Force a full repaint on the next draw (after resets, restores, etc.)
+        self.full_redraw = True
+
+    def draw_dot(self, surface, x, y):
+        center = (x*CELL_SIZE + CELL_SIZE//2, y*CELL_SIZE + CELL_SIZE//2)
+        pygame.draw.circle(surface, WHITE, center, 3)
+
+    def sprite_rects(self, engine, positions):
+        if engine.game_over:
+            positions = positions[:-1]
+        return [pygame.Rect(pos, (CELL_SIZE, CELL_SIZE)) for pos in positions]
+
+    def draw_sprites(self, engine, positions):
+        # Draw Pac-Man
+        if not engine.game_over:
+            px, py = positions[-1]
+            pygame.draw.circle(self.screen, YELLOW, (px + CELL_SIZE//2, py + CELL_SIZE//2), CELL_SIZE//2 - 2)
+
+        # Draw Ghosts
+        for gx, gy in positions[:-1]:
+            pygame.draw.rect(self.screen, RED, (gx, gy, CELL_SIZE, CELL_SIZE))
+
+    def draw_hud(self, engine):
+        hud_rect = pygame.Rect(0, HEIGHT - 60, WIDTH, 60)
+        self.screen.blit(self.board, hud_rect, hud_rect)
+        score_text = self.font.render(f"Score: {engine.score}", True, WHITE)
+        lives_text = self.font.render(f"Lives: {engine.lives}", True, WHITE)
+        self.screen.blit(score_text, (10, HEIGHT - 50))
+        self.screen.blit(lives_text, (WIDTH - 120, HEIGHT - 50))
+        self.hud_state = (engine.score, engine.lives)
+        return hud_rect
+
+    def draw_game_over(self):
         overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 128))
-        screen.blit(overlay, (0, 0))
-        
+        self.screen.blit(overlay, (0, 0))
+
         go_font = pygame.font.Font(None, 72)
         go_text = go_font.render("GAME OVER", True, RED)
-        restart_text = font.render("Press R to restart", True, GREEN)
-        
-        screen.blit(go_text, (WIDTH//2 - go_text.get_width()//2, HEIGHT//2 - 50))
-        screen.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, HEIGHT//2 + 20))
-    
-    pygame.display.flip()
-
-# Main game loop
-while True:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
-    
-    handle_pacman_input()
-    
-    if not game_over:
-        move_character(pacman, MAZE)
-        move_ghost()
-        check_collisions()
-        
-        # Handle queued direction changes
-        if pacman["next_dir"] != (0, 0) and pacman["progress"] == 0:
-            next_x = pacman["grid_x"] + pacman["next_dir"][0]
-            next_y = pacman["grid_y"] + pacman["next_dir"][1]
-            if 0 <= next_x < len(MAZE[0]) and 0 <= next_y < len(MAZE):
-                if MAZE[next_y][next_x] != "#":
-                    pacman["direction"] = pacman["next_dir"]
-                    pacman["next_dir"] = (0, 0)
-    
-    draw()
-    clock.tick(FPS)
+        restart_text = self.font.render("Press R to restart", True, GREEN)
+
+        self.screen.blit(go_text, (WIDTH//2 - go_text.get_width()//2, HEIGHT//2 - 50))
+        self.screen.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, HEIGHT//2 + 20))
+
+    def redraw(self, engine, positions):
+        self.board = self.background.copy()
+        for x, y in engine.dot_cells():
+            self.draw_dot(self.board, x, y)
+        self.screen.blit(self.board, (0, 0))
+        self.draw_sprites(engine, positions)
+        self.draw_hud(engine)
+        if engine.game_over:
+            self.draw_game_over()
+        pygame.display.flip()
+
+        self.full_redraw = False
+        self.game_over = engine.game_over
+        self.eaten_seen = len(engine.eaten)
+        self.board_version = engine.board_version
+        self.last_rects = self.sprite_rects(engine, positions)
+
+    def draw(self, engine, positions=None):
+        # `positions` are interpolated sprite positions; defaults to the
+        # engine's current state
+        if positions is None:
+            positions = sprite_positions(engine)
+        # Refills and restores bump board_version; game over toggles the overlay
+        if (self.full_redraw or engine.game_over != self.game_over
+                or engine.board_version != self.board_version):
+            self.redraw(engine, positions)
+            return
+        if engine.game_over:
+            return
+
+        dirty = []
+        # Erase eaten dots from the board
+        for x, y in engine.eaten[self.eaten_seen:]:
+            cell = pygame.Rect(x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE)
+            self.board.blit(self.background, cell, cell)
+            dirty.append(cell)
+        self.eaten_seen = len(engine.eaten)
+
+        # Erase sprites at their old positions, then draw them at the new ones
+        dirty.extend(self.last_rects)
+        for rect in dirty:
+            self.screen.blit(self.board, rect, rect)
+        self.draw_sprites(engine, positions)
+        self.last_rects = self.sprite_rects(engine, positions)
+        dirty.extend(self.last_rects)
+
+        if (engine.score, engine.lives) != self.hud_state:
+            dirty.append(self.draw_hud(engine))
+
+        pygame.display.update(dirty)
+
+
+class ChunkedRenderer(Renderer):
+    # Scrolling camera for mazes larger than the window. The maze is cut into
+    # CHUNK_CELLS-square tiles that are baked (walls plus current dots) the
+    # first time they come into view and kept in a small LRU cache. A frame
+    # blits only the tiles overlapping the viewport, so frame time depends on
+    # the window size rather than the maze size.
+    def __init__(self, screen, font, engine):
+        self.screen = screen
+        self.font = font
+        self.view = pygame.Rect(0, 0, WIDTH, HEIGHT - 60)
+        self.chunk_px = CHUNK_CELLS * CELL_SIZE
+        self.maze_px = (engine.width * CELL_SIZE, engine.height * CELL_SIZE)
+        self.chunks = OrderedDict()
+        self.board_version = None
+        self.eaten_seen = 0
+
+    def invalidate(self):
+        self.chunks.clear()
+
+    def bake_chunk(self, engine, cx, cy):
+        chunk = pygame.Surface((self.chunk_px, self.chunk_px)).convert()
+        chunk.fill(BLACK)
+        for y in range(cy * CHUNK_CELLS, min((cy + 1) * CHUNK_CELLS, engine.height)):
+            row = engine.maze[y]
+            for x in range(cx * CHUNK_CELLS, min((cx + 1) * CHUNK_CELLS, engine.width)):
+                lx, ly = x - cx * CHUNK_CELLS, y - cy * CHUNK_CELLS
+                if row[x] == "#":
+                    pygame.draw.rect(chunk, BLUE, (lx*CELL_SIZE, ly*CELL_SIZE, CELL_SIZE, CELL_SIZE))
+                elif engine.has_dot(x, y):
+                    self.draw_dot(chunk, lx, ly)
+        return chunk
+
+    def chunk(self, engine, key):
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = self.bake_chunk(engine, *key)
+            if len(self.chunks) > CHUNK_CACHE:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    def camera(self, target):
+        # Center on the target, clamped to the maze edges
+        x = target[0] + CELL_SIZE // 2 - self.view.width // 2
+        y = target[1] + CELL_SIZE // 2 - self.view.height // 2
+        x = max(0, min(x, self.maze_px[0] - self.view.width))
+        y = max(0, min(y, self.maze_px[1] - self.view.height))
+        return x, y
+
+    def draw_hud(self, engine):
+        hud_rect = pygame.Rect(0, HEIGHT - 60, WIDTH, 60)
+        self.screen.fill(BLACK, hud_rect)
+        score_text = self.font.render(f"Score: {engine.score}", True, WHITE)
+        lives_text = self.font.render(f"Lives: {engine.lives}", True, WHITE)
+        self.screen.blit(score_text, (10, HEIGHT - 50))
+        self.screen.blit(lives_text, (WIDTH - 120, HEIGHT - 50))
+        return hud_rect
+
+    def draw(self, engine, positions=None):
+        if positions is None:
+            positions = sprite_positions(engine)
+        if engine.board_version != self.board_version:
+            self.chunks.clear()
+            self.board_version = engine.board_version
+            self.eaten_seen = 0
+
+        # Erase eaten dots from chunks that are already baked
+        for x, y in engine.eaten[self.eaten_seen:]:
+            chunk = self.chunks.get((x // CHUNK_CELLS, y // CHUNK_CELLS))
+            if chunk is not None:
+                lx, ly = x % CHUNK_CELLS, y % CHUNK_CELLS
+                chunk.fill(BLACK, (lx*CELL_SIZE, ly*CELL_SIZE, CELL_SIZE, CELL_SIZE))
+        self.eaten_seen = len(engine.eaten)
+
+        cam_x, cam_y = self.camera(positions[-1])
+        self.screen.set_clip(self.view)
+        self.screen.fill(BLACK, self.view)
+        for cy in range(cam_y // self.chunk_px, (cam_y + self.view.height - 1) // self.chunk_px + 1):
+            for cx in range(cam_x // self.chunk_px, (cam_x + self.view.width - 1) // self.chunk_px + 1):
+                if cx * CHUNK_CELLS < engine.width and cy * CHUNK_CELLS < engine.height:
+                    self.screen.blit(self.chunk(engine, (cx, cy)),
+                                     (cx * self.chunk_px - cam_x, cy * self.chunk_px - cam_y))
+
+        # Only ghosts inside the viewport are drawn; Pac-Man (last) always is
+        shown = [(x - cam_x, y - cam_y) for x, y in positions[:-1]
+                 if -CELL_SIZE < x - cam_x < self.view.width and -CELL_SIZE < y - cam_y < self.view.height]
+        shown.append((positions[-1][0] - cam_x, positions[-1][1] - cam_y))
+        self.draw_sprites(engine, shown)
+        self.screen.set_clip(None)
+
+        self.draw_hud(engine)
+        if engine.game_over:
+            self.draw_game_over()
+        pygame.display.flip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pac-Man")
+    parser.add_argument("--max-speed", action="store_true",
+                        help="step the simulation once per frame with no clock, as fast as it can draw")
+    parser.add_argument("--fps", type=int, default=FPS,
+                        help="render frame cap (0 = uncapped); game logic always runs at a fixed rate")
+    parser.add_argument("--chase", action="store_true",
+                        help="use the chase/scatter ghost AI instead of the wandering ghost")
+    parser.add_argument("--ghosts", type=int, default=1, help="number of ghosts")
+    parser.add_argument("--seed", type=int, help="ghost RNG seed")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record the session for packman_replay.py (saved on quit)")
+    parser.add_argument("--generate", metavar="WxH",
+                        help="play on a generated maze of this size with a scrolling camera")
+    parser.add_argument("--maze-seed", type=int, help="seed for --generate")
+    parser.add_argument("--level", metavar="PATH",
+                        help="play a level file (e.g. levels/classic.txt) with a scrolling camera")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="let the Monte Carlo tree search autopilot steer Pac-Man")
+    parser.add_argument("--think-ms", type=float, default=40,
+                        help="autopilot search budget per decision, in milliseconds")
+    args = parser.parse_args()
+    if (args.generate or args.level) and args.record:
+        parser.error("--record only supports the built-in maze")
+    if args.generate and args.level:
+        parser.error("--generate and --level are mutually exclusive")
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Pac-Man")
+    clock = pygame.time.Clock()
+    font = pygame.font.Font(None, 36)
+
+    ghost_ai = "chase" if args.chase else "random"
+    if args.record:
+        # Route every tick and restart through the recorder
+        session = Recorder(args.record, args.seed, ghost_ai, args.ghosts)
+        engine = session.engine
+    elif args.generate:
+        width, height = (int(n) for n in args.generate.lower().split("x"))
+        maze, pacman_start, ghost_start = generate_maze(width, height, args.maze_seed)
+        session = engine = PacmanEngine(maze, seed=args.seed, ghost_ai=ghost_ai, num_ghosts=args.ghosts,
+                                        pacman_start=pacman_start, ghost_start=ghost_start)
+    elif args.level:
+        session = engine = PacmanEngine(seed=args.seed, ghost_ai=ghost_ai, num_ghosts=args.ghosts,
+                                        level=load_level(args.level))
+    else:
+        session = engine = PacmanEngine(seed=args.seed, ghost_ai=ghost_ai, num_ghosts=args.ghosts)
+    scrolling = args.generate or args.level
+    renderer = ChunkedRenderer(screen, font, engine) if scrolling else Renderer(screen, font)
+    pilot = Autopilot(engine, args.think_ms / 1000, level_path=args.level) if args.autopilot else None
+
+    # Fixed timestep: logic advances in whole ticks of 1/FPS seconds however
+    # fast frames are drawn, and draw() interpolates between the last two
+    # ticks using the leftover time in the accumulator
+    step_time = 1.0 / FPS
+    accumulator = 0.0
+    last_time = time.perf_counter()
+    previous = current = sprite_positions(engine)
+
+    # Main game loop
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                if args.record:
+                    session.save()
+                if pilot:
+                    pilot.close()
+                pygame.quit()
+                sys.exit()
+
+        action, restart = handle_pacman_input()
+        if restart and engine.game_over:
+            session.reset()
+        if args.max_speed:
+            session.step(pilot.decide(engine) if pilot else action)
+            previous = current = sprite_positions(engine)
+            alpha = 1.0
+        else:
+            now = time.perf_counter()
+            # Clamp long hitches so the simulation doesn't spiral catching up
+            accumulator += min(now - last_time, 0.25)
+            last_time = now
+            while accumulator >= step_time:
+                previous = current
+                move = action
+                if pilot:
+                    # Search time isn't game time: leave it off the clock so a
+                    # junction doesn't set off a burst of catch-up ticks
+                    thinking = time.perf_counter()
+                    move = pilot.decide(engine)
+                    last_time += time.perf_counter() - thinking
+                session.step(move)
+                current = sprite_positions(engine)
+                accumulator -= step_time
+            alpha = accumulator / step_time
+
+        renderer.draw(engine, interpolate(previous, current, alpha))
+        if args.fps and not args.max_speed:
+            clock.tick(args.fps)
+
+
+if __name__ == "__main__":
+    main()
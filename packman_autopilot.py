@@ -0,0 +1,230 @@
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import time
+
+from packman_engine import PacmanEngine, DIRECTIONS, DIR_INDEX, MASK_INDICES, REVERSE_BIT, STOP, \
+    CELL_SIZE, DOT_SCORE, FPS, PACMAN_SPEED
+from packman_level import load_level
+
+# Monte Carlo tree search autopilot for Pac-Man. Whenever Pac-Man stands on a
+# junction (or is stopped) the search plays the game forward from an engine
+# snapshot: tree moves are "head this way until the next junction", leaves
+# are finished with random non-reversing rollouts, and every iteration draws
+# a fresh ghost RNG seed so the tree averages over possible ghost futures.
+# Rollouts are spread over a process pool (root parallelism) and each
+# decision is bounded by a wall-clock budget.
+
+HORIZON = 4 * FPS  # ticks looked ahead from each decision
+EXPLORATION = 0.7
+
+
+class Node:
+    __slots__ = ("children", "untried", "visits", "total")
+
+    def __init__(self):
+        self.children = {}
+        self.untried = None  # filled on first visit with Pac-Man alive
+        self.visits = 0
+        self.total = 0.0
+
+
+class Searcher:
+    """Runs MCTS iterations on its own engine copy; one per worker process.
+
+    With a ``level_path`` the copy maps that level's compiled cache instead
+    of building its tables again.
+    """
+
+    def __init__(self, engine_kwargs, horizon=HORIZON, level_path=None):
+        if level_path:
+            engine_kwargs = dict(engine_kwargs, level=load_level(level_path))
+        self.engine = PacmanEngine(**engine_kwargs)
+        self.table = self.engine.table
+        self.horizon = horizon
+        self.rng = random.Random()
+        # Dots Pac-Man could possibly eat within the horizon, to scale rewards
+        self.best = DOT_SCORE * (horizon * PACMAN_SPEED // CELL_SIZE + 1)
+
+    def at_decision(self):
+        pacman = self.engine.pacman
+        if pacman.progress:
+            return False
+        cell = pacman.grid_y * self.engine.width + pacman.grid_x
+        return pacman.direction == STOP or self.table.intersection[cell]
+
+    def options(self):
+        pacman = self.engine.pacman
+        return MASK_INDICES[self.table.moves[pacman.grid_y * self.engine.width + pacman.grid_x]]
+
+    def play(self, d, lives, end):
+        # Head in direction d until the next decision point, a lost life or the horizon
+        engine = self.engine
+        engine.step(DIRECTIONS[d])
+        while engine.ticks < end and engine.lives == lives and not self.at_decision():
+            engine.advance(end - engine.ticks)
+
+    def rollout(self, lives, end):
+        engine = self.engine
+        moves = self.table.moves
+        width = engine.width
+        pacman = engine.pacman
+        choice = self.rng.choice
+        while engine.ticks < end and engine.lives == lives:
+            if self.at_decision():
+                mask = moves[pacman.grid_y * width + pacman.grid_x]
+                forward = mask & ~REVERSE_BIT[DIR_INDEX[pacman.direction]]
+                engine.step(DIRECTIONS[choice(MASK_INDICES[forward or mask])])
+            else:
+                engine.advance(end - engine.ticks)
+
+    def iterate(self, root, blob):
+        engine = self.engine
+        engine.restore(blob)
+        engine.rng.seed(self.rng.getrandbits(64))
+        lives, score = engine.lives, engine.score
+        end = engine.ticks + self.horizon
+
+        # Selection and expansion
+        node = root
+        path = [root]
+        while engine.ticks < end and engine.lives == lives:
+            if node.untried is None:
+                node.untried = list(self.options())
+            if node.untried:
+                d = node.untried.pop(self.rng.randrange(len(node.untried)))
+                self.play(d, lives, end)
+                node.children[d] = node = Node()
+                path.append(node)
+                break
+            if not node.children:
+                break
+            log_n = math.log(node.visits)
+            d, node = max(node.children.items(), key=lambda item: item[1].total / item[1].visits
+                          + EXPLORATION * math.sqrt(log_n / item[1].visits))
+            self.play(d, lives, end)
+            path.append(node)
+
+        self.rollout(lives, end)
+        # Losing a life scores 0; surviving scores 0.5-1 by dots eaten
+        value = 0.0 if engine.lives < lives else 0.5 + 0.5 * min(1.0, (engine.score - score) / self.best)
+        for node in path:
+            node.visits += 1
+            node.total += value
+
+    def search(self, blob, deadline):
+        """Iterate until ``deadline`` (time.monotonic()); returns per-direction
+        ``(visits, total value)`` at the root and the number of rollouts."""
+        root = Node()
+        rollouts = 0
+        while True:
+            self.iterate(root, blob)
+            rollouts += 1
+            if time.monotonic() >= deadline:
+                break
+        return {d: (child.visits, child.total) for d, child in root.children.items()}, rollouts
+
+
+# Per-process searcher, created by the pool initializer
+worker = None
+
+
+def init_worker(engine_kwargs, horizon, level_path):
+    global worker
+    worker = Searcher(engine_kwargs, horizon, level_path)
+
+
+def search_task(args):
+    return worker.search(*args)
+
+
+class Autopilot:
+    """Picks Pac-Man's direction at junctions by parallel MCTS.
+
+    ``decide(engine)`` returns a direction, or None when Pac-Man is between
+    junctions and should keep going. Each decision searches for ``budget``
+    seconds on ``workers`` processes (default: every core). Pass the
+    ``level_path`` the engine's level was loaded from so the searchers load
+    it too.
+    """
+
+    def __init__(self, engine, budget=0.05, workers=None, horizon=HORIZON, level_path=None):
+        engine_kwargs = {"maze": engine.maze, "ghost_ai": engine.ghost_ai, "num_ghosts": engine.num_ghosts,
+                         "pacman_start": engine.pacman_start, "ghost_start": engine.ghost_starts[0]}
+        self.budget = budget
+        self.workers = workers or os.cpu_count() or 1
+        self.local = Searcher(engine_kwargs, horizon, level_path)
+        self.pool = None
+        if self.workers > 1:
+            self.pool = multiprocessing.Pool(self.workers, init_worker, (engine_kwargs, horizon, level_path))
+        self.decisions = 0
+        self.rollouts = 0
+        self.search_time = 0.0
+
+    @property
+    def rollouts_per_sec(self):
+        return self.rollouts / self.search_time if self.search_time else 0.0
+
+    def decide(self, engine):
+        local = self.local
+        pacman = engine.pacman
+        if pacman.progress:
+            return None
+        cell = pacman.grid_y * engine.width + pacman.grid_x
+        if pacman.direction != STOP and not local.table.intersection[cell]:
+            return None
+        options = MASK_INDICES[local.table.moves[cell]]
+        if len(options) < 2:
+            return DIRECTIONS[options[0]] if options else None
+
+        start = time.monotonic()
+        blob = engine.snapshot()
+        deadline = start + self.budget
+        if self.pool:
+            results = self.pool.map(search_task, [(blob, deadline)] * self.workers, chunksize=1)
+        else:
+            results = [local.search(blob, deadline)]
+        self.search_time += time.monotonic() - start
+
+        visits = dict.fromkeys(options, 0)
+        for stats, rollouts in results:
+            self.rollouts += rollouts
+            for d, (n, _) in stats.items():
+                visits[d] += n
+        self.decisions += 1
+        return DIRECTIONS[max(visits, key=visits.get)]
+
+    def close(self):
+        if self.pool:
+            self.pool.terminate()
+            self.pool = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Pac-Man headlessly with the MCTS autopilot")
+    parser.add_argument("--budget", type=float, default=50, help="milliseconds of search per decision")
+    parser.add_argument("--workers", type=int, help="search processes (default: every core)")
+    parser.add_argument("--ticks", type=int, default=60 * FPS, help="stop after this many game ticks")
+    parser.add_argument("--chase", action="store_true", help="use the chase/scatter ghost AI")
+    parser.add_argument("--ghosts", type=int, default=1, help="number of ghosts")
+    parser.add_argument("--seed", type=int, help="ghost RNG seed")
+    parser.add_argument("--level", metavar="PATH", help="play a level file instead of the built-in maze")
+    args = parser.parse_args()
+
+    engine = PacmanEngine(seed=args.seed, ghost_ai="chase" if args.chase else "random", num_ghosts=args.ghosts,
+                          level=load_level(args.level) if args.level else None)
+    pilot = Autopilot(engine, args.budget / 1000, args.workers, level_path=args.level)
+    start = time.perf_counter()
+    while not engine.game_over and engine.ticks < args.ticks:
+        if engine.pacman.progress == 0:
+            engine.step(pilot.decide(engine))
+        else:
+            engine.advance(args.ticks - engine.ticks)
+    elapsed = time.perf_counter() - start
+    pilot.close()
+
+    print(f"Score: {engine.score}  Level: {engine.level}  Lives: {engine.lives}  Ticks: {engine.ticks}")
+    print(f"{pilot.decisions} decisions, {pilot.rollouts:,} rollouts in {elapsed:.2f}s "
+          f"({pilot.rollouts_per_sec:,.0f} rollouts/sec on {pilot.workers} worker(s))")
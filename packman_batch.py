@@ -0,0 +1,185 @@
+import sys
+import time
+
+import numpy as np
+
+from packman_engine import (
+    MazeTable, MAZE, CELL_SIZE, DOT_SCORE, START_LIVES, PACMAN_SPEED, GHOST_SPEED,
+    PACMAN_START, GHOST_START, STOP_INDEX, DIR_DX, DIR_DY, REVERSE_BIT,
+)
+
+# Vectorized Pac-Man: N independent games held in NumPy arrays and advanced
+# together by one step() call. Same rules as PacmanEngine with the wandering
+# ghost AI, but ghosts draw from a NumPy generator, so individual games do not
+# replay PacmanEngine's exact RNG stream.
+
+# The k-th set bit of each 4-bit move mask (-1 past the bit count)
+POPCOUNT = np.array([bin(m).count("1") for m in range(16)], dtype=np.int64)
+NTH_BIT = np.full((16, 4), -1, dtype=np.int64)
+for mask in range(16):
+    for k, bit in enumerate(b for b in range(4) if mask >> b & 1):
+        NTH_BIT[mask, k] = bit
+
+
+class BatchPacman:
+    """``n`` Pac-Man games stepped in lockstep.
+
+    Actions are DIRECTIONS indices (0-3) or STOP_INDEX for no input. step()
+    returns ``(observations, rewards, dones)``; finished games (out of lives)
+    are reset automatically, so ``dones`` marks the step a game ended on.
+    """
+
+    def __init__(self, n, maze=MAZE, seed=None, num_ghosts=1,
+                 pacman_start=PACMAN_START, ghost_start=GHOST_START):
+        table = MazeTable(maze)
+        self.n = n
+        self.num_ghosts = num_ghosts
+        self.width, self.height = table.width, table.height
+        self.cells = self.width * self.height
+        self.moves = np.frombuffer(bytes(table.moves), dtype=np.uint8).astype(np.int64)
+        self.neighbors = np.array(table.neighbors, dtype=np.int64).reshape(self.cells, 4)
+        self.walls = ~np.frombuffer(bytes(table.walkable), dtype=bool).reshape(self.height, self.width)
+        self.dot_template = np.array([char in ('.', ' ') for row in maze for char in row], dtype=bool)
+        self.pacman_start = pacman_start[1] * self.width + pacman_start[0]
+        self.ghost_start = ghost_start[1] * self.width + ghost_start[0]
+        self.rng = np.random.default_rng(seed)
+
+        self.dx = np.array(DIR_DX, dtype=np.int64)
+        self.dy = np.array(DIR_DY, dtype=np.int64)
+        self.reverse_bit = np.array(REVERSE_BIT, dtype=np.int64)
+        self.dir_bit = np.array([1, 2, 4, 8, 0], dtype=np.int64)
+
+        self.pac_cell = np.empty(n, dtype=np.int64)
+        self.pac_dir = np.empty(n, dtype=np.int64)
+        self.pac_next = np.empty(n, dtype=np.int64)
+        self.pac_progress = np.empty(n, dtype=np.int64)
+        self.ghost_cell = np.empty((n, num_ghosts), dtype=np.int64)
+        self.ghost_dir = np.empty((n, num_ghosts), dtype=np.int64)
+        self.ghost_progress = np.empty((n, num_ghosts), dtype=np.int64)
+        self.dots = np.empty((n, self.cells), dtype=bool)
+        self.dots_left = np.empty(n, dtype=np.int64)
+        self.score = np.empty(n, dtype=np.int64)
+        self.lives = np.empty(n, dtype=np.int64)
+        self.ticks = 0
+        self.reset()
+
+    def reset(self):
+        self.reset_games(slice(None))
+        return self.observe()
+
+    def reset_games(self, idx):
+        # Start fresh games for the selected rows (boolean mask or slice)
+        self.score[idx] = 0
+        self.lives[idx] = START_LIVES
+        self.dots[idx] = self.dot_template
+        self.dots_left[idx] = self.dot_template.sum()
+        self.respawn(idx)
+
+    def respawn(self, idx):
+        self.pac_cell[idx] = self.pacman_start
+        self.pac_dir[idx] = STOP_INDEX
+        self.pac_next[idx] = STOP_INDEX
+        self.pac_progress[idx] = 0
+        self.ghost_cell[idx] = self.ghost_start
+        self.ghost_dir[idx] = STOP_INDEX
+        self.ghost_progress[idx] = 0
+
+    def advance(self, cell, direction, progress, speed):
+        # Shared move rule: accumulate progress, step into the neighbor cell
+        # on arrival, or stop dead against a wall
+        moving = direction != STOP_INDEX
+        progress += np.where(moving, speed, 0)
+        arrived = progress >= CELL_SIZE
+        target = self.neighbors[cell, np.minimum(direction, 3)]
+        blocked = arrived & (target < 0)
+        entered = arrived & ~blocked
+        np.copyto(cell, target, where=entered)
+        progress -= np.where(entered, CELL_SIZE, 0)
+        progress[blocked] = 0
+        direction[blocked] = STOP_INDEX
+
+    def pixel_pos(self, cell, direction, progress):
+        x = cell % self.width * CELL_SIZE + self.dx[direction] * progress
+        y = cell // self.width * CELL_SIZE + self.dy[direction] * progress
+        return x, y
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64)
+        rows = np.arange(self.n)
+        self.ticks += 1
+
+        # Steering: turn now if on a cell and open, otherwise queue the turn
+        steer = actions != STOP_INDEX
+        at_cell = self.pac_progress == 0
+        open_now = (self.moves[self.pac_cell] & self.dir_bit[actions]) != 0
+        self.pac_dir = np.where(steer & at_cell & open_now, actions, self.pac_dir)
+        self.pac_next = np.where(steer & ~at_cell, actions, self.pac_next)
+
+        self.advance(self.pac_cell, self.pac_dir, self.pac_progress, PACMAN_SPEED)
+
+        # Ghosts on a cell pick uniformly among open, non-reversing directions
+        deciding = self.ghost_progress == 0
+        allowed = self.moves[self.ghost_cell] & ~self.reverse_bit[self.ghost_dir]
+        count = POPCOUNT[allowed]
+        pick = (self.rng.random(allowed.shape) * count).astype(np.int64)
+        chosen = np.where(count > 0, NTH_BIT[allowed, np.minimum(pick, 3)], STOP_INDEX)
+        self.ghost_dir = np.where(deciding, chosen, self.ghost_dir)
+        self.advance(self.ghost_cell, self.ghost_dir, self.ghost_progress, GHOST_SPEED)
+
+        # Dot collection
+        eaten = self.dots[rows, self.pac_cell]
+        self.dots[rows, self.pac_cell] = False
+        self.dots_left -= eaten
+        rewards = eaten * DOT_SCORE
+        self.score += rewards
+
+        # Ghost collision (two CELL_SIZE squares overlapping)
+        px, py = self.pixel_pos(self.pac_cell, self.pac_dir, self.pac_progress)
+        gx, gy = self.pixel_pos(self.ghost_cell, self.ghost_dir, self.ghost_progress)
+        hit = ((np.abs(gx - px[:, None]) < CELL_SIZE) & (np.abs(gy - py[:, None]) < CELL_SIZE)).any(axis=1)
+        self.lives -= hit
+        dones = self.lives <= 0
+        self.respawn(hit & ~dones)
+
+        # Cleared boards refill and start over from the spawn points
+        cleared = self.dots_left == 0
+        if cleared.any():
+            self.dots[cleared] = self.dot_template
+            self.dots_left[cleared] = self.dot_template.sum()
+            self.respawn(cleared)
+
+        # Queued direction changes
+        queued = ((self.pac_next != STOP_INDEX) & (self.pac_progress == 0)
+                  & ((self.moves[self.pac_cell] & self.dir_bit[self.pac_next]) != 0))
+        self.pac_dir = np.where(queued, self.pac_next, self.pac_dir)
+        self.pac_next = np.where(queued, STOP_INDEX, self.pac_next)
+
+        if dones.any():
+            self.reset_games(dones)
+        return self.observe(), rewards, dones
+
+    def observe(self):
+        """(n, 4, height, width) uint8 planes: walls, dots, Pac-Man, ghost count."""
+        obs = np.zeros((self.n, 4, self.cells), dtype=np.uint8)
+        obs[:, 0] = self.walls.reshape(-1)
+        obs[:, 1] = self.dots
+        rows = np.arange(self.n)
+        obs[rows, 2, self.pac_cell] = 1
+        np.add.at(obs, (np.repeat(rows, self.num_ghosts), 3, self.ghost_cell.reshape(-1)), 1)
+        return obs.reshape(self.n, 4, self.height, self.width)
+
+
+if __name__ == "__main__":
+    # Benchmark: python packman_batch.py [games] [steps]
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    env = BatchPacman(n, seed=0)
+    rng = np.random.default_rng(1)
+    start = time.perf_counter()
+    total = 0
+    for _ in range(steps):
+        obs, rewards, dones = env.step(rng.integers(0, 5, size=n))
+        total += rewards.sum()
+    elapsed = time.perf_counter() - start
+    print(f"{n} games x {steps} steps in {elapsed:.2f}s "
+          f"({n * steps / elapsed:,.0f} game-steps/sec), mean score gained {total / n:.1f}")
@@ -0,0 +1,753 @@
+import math
+import random
+import struct
+import sys
+import time
+from array import array
+
+# Headless Pac-Man simulation core. Nothing in here touches pygame, so the
+# rules can be stepped without a display and as fast as the CPU allows.
+
+# Game constants
+CELL_SIZE = 30
+FPS = 60
+START_LIVES = 3
+DOT_SCORE = 10
+PACMAN_SPEED = 3  # pixels per tick
+GHOST_SPEED = 2
+# Chase/scatter ghost AI alternates between these phases
+SCATTER_TICKS = 7 * FPS
+CHASE_TICKS = 20 * FPS
+
+# Corrected maze layout (fixed central corridor)
+MAZE = [
+    "###################",
+    "#........#........#",
+    "# ### ## # ## ### #",
+    "# ### ## # ## ### #",
+    "# ### ## # ## ### #",
+    "#.................#",
+    "# ### # ### # ### #",
+    "# ### # ### # ### #",
+    "#     #     #     #",
+    "###################",
+    "#     #     #     #",  # Row 9
+    "# ### # ### # ### #",
+    "# ### # ### # ### #",
+    "#.................#",
+    "# ### ## # ## ### #",
+    "# ### ## # ## ### #",
+    "# ### ## # ## ### #",
+    "#.................#",  # Row 17 - open corridor
+    "###################",
+]
+
+PACMAN_START = (9, 17)  # Center of open corridor
+GHOST_START = (9, 5)
+
+# Directions
+STOP = (0, 0)
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+DIRECTIONS = [RIGHT, LEFT, DOWN, UP]
+ALL_DIRECTIONS = DIRECTIONS + [STOP]
+DIR_INDEX = {d: i for i, d in enumerate(ALL_DIRECTIONS)}
+DIR_BIT = {d: 1 << i for i, d in enumerate(DIRECTIONS)}
+DIR_BIT[STOP] = 0
+# Directions allowed by each 4-bit move mask, in DIRECTIONS order
+MASK_DIRS = [[d for i, d in enumerate(DIRECTIONS) if mask >> i & 1] for mask in range(16)]
+# Index-based direction tables for array-stored actors; index 4 means stopped
+STOP_INDEX = 4
+DIR_DX = (1, -1, 0, 0, 0)
+DIR_DY = (0, 0, 1, -1, 0)
+REVERSE_BIT = (1 << 1, 1 << 0, 1 << 3, 1 << 2, 0)
+MASK_INDICES = [[i for i in range(4) if mask >> i & 1] for mask in range(16)]
+
+
+MASK64 = (1 << 64) - 1
+
+
+class XorShiftRandom:
+    """xorshift64* generator whose entire state is one 64-bit int.
+
+    Used instead of random.Random so snapshots stay small and fixed-size
+    (a Mersenne Twister state is about 2.5 KB).
+    """
+
+    __slots__ = ("state",)
+
+    def __init__(self, seed=None):
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        if seed is None:
+            seed = random.getrandbits(64)
+        # splitmix64 scramble so small or similar seeds give unrelated streams
+        z = (seed + 0x9E3779B97F4A7C15) & MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        self.state = (z ^ (z >> 31)) or 1
+
+    def next(self):
+        x = self.state
+        x ^= x >> 12
+        x ^= (x << 25) & MASK64
+        x ^= x >> 27
+        self.state = x
+        return (x * 0x2545F4914F6CDD1D) & MASK64
+
+    def random(self):
+        return (self.next() >> 11) * (1.0 / (1 << 53))
+
+    def choice(self, seq):
+        return seq[((self.next() >> 32) * len(seq)) >> 32]
+
+
+class MazeTable:
+    """The maze compiled once into flat per-cell lookup tables.
+
+    Cells are indexed ``y * width + x``. ``moves[cell]`` is a bitmask over
+    DIRECTIONS, ``neighbors[cell * 4 + d]`` is the cell reached by moving in
+    ``DIRECTIONS[d]`` (tunnel wrap applied) or -1 for a wall, and
+    ``intersection[cell]`` is set everywhere except straight corridors, i.e.
+    wherever a moving character may have to change heading. ``near[cell]``
+    lists the walkable cells in the 3x3 block around any cell, for the
+    ghost collision broadphase.
+    """
+
+    def __init__(self, maze):
+        self.width = width = len(maze[0])
+        self.height = height = len(maze)
+        self.walkable = bytearray(char != "#" for row in maze for char in row)
+        self.moves = bytearray(width * height)
+        self.neighbors = array("i", [-1]) * (width * height * 4)
+        self.intersection = bytearray(width * height)
+
+        for y in range(height):
+            for x in range(width):
+                cell = y * width + x
+                if not self.walkable[cell]:
+                    continue
+                for d, (dx, dy) in enumerate(DIRECTIONS):
+                    nx, ny = x + dx, y + dy
+                    if not 0 <= ny < height:
+                        continue
+                    # Leaving the grid sideways is a tunnel to the other edge
+                    target = ny * width + nx % width
+                    if self.walkable[target]:
+                        self.neighbors[cell * 4 + d] = target
+                        self.moves[cell] |= 1 << d
+                self.intersection[cell] = self.moves[cell] not in (0b0011, 0b1100)
+
+        self.near = [
+            tuple(ny * width + nx
+                  for ny in range(max(y - 1, 0), min(y + 2, height))
+                  for nx in range(max(x - 1, 0), min(x + 2, width))
+                  if self.walkable[ny * width + nx])
+            for y in range(height) for x in range(width)
+        ]
+
+    def cell(self, x, y):
+        return y * self.width + x
+
+    def can_move(self, x, y, direction):
+        return bool(self.moves[y * self.width + x] & DIR_BIT[direction])
+
+
+UNREACHABLE = 0xFFFF
+NO_DIR = 0xFF
+# Above this many walkable cells PathTable's n^2 tables are too big to build,
+# and the chase AI steers with a FieldPaths instead
+MAX_PATH_CELLS = 4096
+CHASE_RADIUS = 48  # maze steps FieldPaths searches around a chase target
+
+
+def scatter_corners(table, cells):
+    # Scatter targets: the walkable cell nearest each corner of the grid
+    w, h = table.width, table.height
+    return [
+        min(cells, key=lambda c: abs(c % w - cx) + abs(c // w - cy))
+        for cx, cy in ((w - 1, 0), (0, 0), (w - 1, h - 1), (0, h - 1))
+    ]
+
+
+class PathTable:
+    """All-pairs shortest paths over the walkable cells of a MazeTable.
+
+    Walkable cells get compact indices ``0..n-1``. ``dist[a * n + b]`` is the
+    maze distance from a to b (UNREACHABLE if there is no path) and
+    ``next_dir[a * n + b]`` is the DIRECTIONS index of the first step from a
+    toward b (NO_DIR if a == b or b is unreachable). Built with one BFS per
+    cell, so it costs O(n^2) time and memory once per maze and every lookup
+    afterwards is O(1). Meant for arcade-sized mazes.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        cells = [cell for cell, open_ in enumerate(table.walkable) if open_]
+        self.cells = array("i", cells)
+        self.index = array("i", [-1]) * len(table.walkable)
+        for i, cell in enumerate(cells):
+            self.index[cell] = i
+        self.n = n = len(cells)
+
+        adjacency = [
+            [(d, self.index[table.neighbors[cell * 4 + d]])
+             for d in range(4) if table.neighbors[cell * 4 + d] >= 0]
+            for cell in cells
+        ]
+        self.dist = dist = array("H", [UNREACHABLE]) * (n * n)
+        self.next_dir = next_dir = bytearray([NO_DIR]) * (n * n)
+        for target in range(n):
+            # BFS outward from the target; the step from a newly reached cell
+            # back toward the target is the reverse of the edge we came in on
+            dist[target * n + target] = 0
+            frontier = [target]
+            depth = 0
+            while frontier:
+                depth += 1
+                reached = []
+                for i in frontier:
+                    for d, j in adjacency[i]:
+                        if dist[j * n + target] == UNREACHABLE:
+                            dist[j * n + target] = depth
+                            next_dir[j * n + target] = d ^ 1  # DIRECTIONS pairs opposites
+                            reached.append(j)
+                frontier = reached
+
+        self.corners = scatter_corners(table, cells)
+
+    def distance(self, cell, target):
+        return self.dist[self.index[cell] * self.n + self.index[target]]
+
+    def step_toward(self, cell, target, allowed):
+        """Direction index of the shortest step from cell toward target.
+
+        ``allowed`` is a move bitmask (ghosts may not reverse). Falls back to
+        the allowed neighbor closest to the target when the next hop is not
+        allowed; returns -1 if none of the allowed moves can reach it.
+        """
+        n = self.n
+        i, t = self.index[cell], self.index[target]
+        d = self.next_dir[i * n + t]
+        if d != NO_DIR and allowed >> d & 1:
+            return d
+        best, best_dist = -1, UNREACHABLE
+        neighbors = self.table.neighbors
+        for d in range(4):
+            if allowed >> d & 1:
+                j = self.index[neighbors[cell * 4 + d]]
+                if self.dist[j * n + t] < best_dist:
+                    best, best_dist = d, self.dist[j * n + t]
+        return best
+
+
+class Actor:
+    # Progress is kept in whole pixels (0..CELL_SIZE) rather than as a float
+    # fraction, so long headless runs stay exact and reproducible.
+    __slots__ = ("grid_x", "grid_y", "progress", "direction", "next_dir", "speed")
+
+    def __init__(self, start, speed):
+        self.speed = speed
+        self.place(start)
+
+    def place(self, start):
+        self.grid_x, self.grid_y = start
+        self.progress = 0
+        self.direction = STOP
+        self.next_dir = STOP
+
+    def pixel_pos(self):
+        return (self.grid_x * CELL_SIZE + self.direction[0] * self.progress,
+                self.grid_y * CELL_SIZE + self.direction[1] * self.progress)
+
+
+class FieldPaths:
+    """Chase steering for mazes too big for a PathTable.
+
+    Offers PathTable's ``corners`` and ``step_toward``. Each scatter corner
+    gets one BFS distance field over the whole grid (``corner_dist``, -1 where
+    unreachable), so memory grows linearly with the maze. Any other target
+    (Pac-Man's cell while chasing) gets a BFS cut off at CHASE_RADIUS steps,
+    redone only when the target moves; ghosts outside it head greedily for
+    the target by grid distance.
+    """
+
+    def __init__(self, table, corners=None, corner_dist=None):
+        self.table = table
+        size = table.width * table.height
+        if corners is None:
+            corners = scatter_corners(table, [c for c, open_ in enumerate(table.walkable) if open_])
+            corner_dist = array("i")
+            for corner in corners:
+                corner_dist.extend(self.field(corner, size))
+        self.corners = corners
+        self.corner_dist = corner_dist
+        view = memoryview(corner_dist)
+        self.fields = {corner: view[k * size:(k + 1) * size] for k, corner in enumerate(corners)}
+        self.chase_target = -1
+        self.chase_field = None
+
+    def field(self, target, radius):
+        # Maze distance of every cell within radius steps of target, else -1
+        neighbors = self.table.neighbors
+        dist = array("i", [-1]) * (self.table.width * self.table.height)
+        dist[target] = 0
+        frontier = [target]
+        depth = 0
+        while frontier and depth < radius:
+            depth += 1
+            reached = []
+            for cell in frontier:
+                for j in neighbors[cell * 4:cell * 4 + 4]:
+                    if j >= 0 and dist[j] < 0:
+                        dist[j] = depth
+                        reached.append(j)
+            frontier = reached
+        return dist
+
+    def step_toward(self, cell, target, allowed):
+        field = self.fields.get(target)
+        if field is None:
+            if target != self.chase_target:
+                self.chase_target, self.chase_field = target, self.field(target, CHASE_RADIUS)
+            field = self.chase_field
+        neighbors = self.table.neighbors
+        best, best_dist = -1, -1
+        for d in range(4):
+            if allowed >> d & 1:
+                dist = field[neighbors[cell * 4 + d]]
+                if dist >= 0 and (best < 0 or dist < best_dist):
+                    best, best_dist = d, dist
+        if best >= 0:
+            return best
+        width = self.table.width
+        ty, tx = divmod(target, width)
+        for d in range(4):
+            if allowed >> d & 1:
+                ny, nx = divmod(neighbors[cell * 4 + d], width)
+                dist = abs(nx - tx) + abs(ny - ty)
+                if best < 0 or dist < best_dist:
+                    best, best_dist = d, dist
+        return best
+
+
+def chase_paths(table):
+    # Exact all-pairs table when it fits, linear-memory fields otherwise
+    if sum(table.walkable) <= MAX_PATH_CELLS:
+        return PathTable(table)
+    return FieldPaths(table)
+
+
+class PacmanEngine:
+    def __init__(self, maze=MAZE, seed=None, ghost_ai="random", num_ghosts=1,
+                 pacman_start=PACMAN_START, ghost_start=GHOST_START, level=None):
+        # A precompiled level (packman_level.load_level) supplies the maze,
+        # spawns and lookup tables instead of deriving them here
+        if level is not None:
+            maze, pacman_start, ghost_start = level.maze, level.pacman_start, level.ghost_start
+        self.maze = maze
+        self.table = level.table if level else MazeTable(maze)
+        # "random" keeps the original wandering ghost; "chase" alternates
+        # scatter and chase phases using the precomputed path table
+        self.ghost_ai = ghost_ai
+        self.paths = None
+        if ghost_ai == "chase":
+            self.paths = level.paths if level else chase_paths(self.table)
+        self.width = self.table.width
+        self.height = self.table.height
+        self.rng = XorShiftRandom(seed)
+        # Dots are a bit-packed bytearray indexed by cell; resets copy this
+        # template in one go instead of rebuilding per-cell state
+        if level is not None:
+            self.dot_template = bytearray(level.dot_template)
+        else:
+            self.dot_template = bytearray((self.width * self.height + 7) // 8)
+            for cell, char in enumerate(char for row in maze for char in row):
+                if char in ('.', ' '):
+                    self.dot_template[cell >> 3] |= 1 << (cell & 7)
+        self.dot_total = bin(int.from_bytes(self.dot_template, "little")).count("1")
+        self.dots = bytearray(self.dot_template)
+        self.pacman_start = pacman_start
+        self.pacman = Actor(pacman_start, PACMAN_SPEED)
+        # Ghosts are stored struct-of-arrays style and advanced in one batch
+        # per tick. For the collision broadphase each ghost is bucketed by the
+        # cell nearest its pixel position (ghost_bucket -> ghost_cells)
+        self.num_ghosts = num_ghosts
+        self.ghost_speed = GHOST_SPEED
+        self.ghost_starts = [ghost_start] * num_ghosts
+        self.ghost_x = array("H", [0]) * num_ghosts
+        self.ghost_y = array("H", [0]) * num_ghosts
+        self.ghost_progress = array("B", [0]) * num_ghosts
+        self.ghost_dir = array("b", [STOP_INDEX]) * num_ghosts
+        self.ghost_bucket = array("i", [0]) * num_ghosts
+        self.ghost_cells = [[] for _ in range(self.width * self.height)]
+        self.ticks = 0
+        self.board_version = 0
+        self.reset()
+
+    def reset(self):
+        self.score = 0
+        self.lives = START_LIVES
+        self.game_over = False
+        self.level = 1
+        self.mode_clock = 0
+        self.refill_dots()
+        self.pacman.place(self.pacman_start)
+        self.place_ghosts()
+
+    def place_ghosts(self):
+        for cell in self.ghost_bucket:
+            self.ghost_cells[cell].clear()
+        for i, (x, y) in enumerate(self.ghost_starts):
+            self.ghost_x[i] = x
+            self.ghost_y[i] = y
+            self.ghost_progress[i] = 0
+            self.ghost_dir[i] = STOP_INDEX
+            self.ghost_bucket[i] = y * self.width + x
+            self.ghost_cells[y * self.width + x].append(i)
+
+    def ghost_pixel_pos(self, i):
+        d, progress = self.ghost_dir[i], self.ghost_progress[i]
+        return (self.ghost_x[i] * CELL_SIZE + DIR_DX[d] * progress,
+                self.ghost_y[i] * CELL_SIZE + DIR_DY[d] * progress)
+
+    def refill_dots(self):
+        self.dots[:] = self.dot_template
+        self.dots_left = self.dot_total
+        # Cells eaten since the last refill, in order; lets renderers repaint
+        # just those cells. Bounded by the dot count, so headless runs are fine.
+        # board_version changes whenever dots come back (refill or restore).
+        self.eaten = []
+        self.board_version += 1
+
+    @property
+    def level_clear(self):
+        return self.dots_left == 0
+
+    def next_level(self):
+        self.level += 1
+        self.mode_clock = 0
+        self.refill_dots()
+        self.pacman.place(self.pacman_start)
+        self.place_ghosts()
+
+    def has_dot(self, x, y):
+        cell = y * self.width + x
+        return bool(self.dots[cell >> 3] >> (cell & 7) & 1)
+
+    def dot_cells(self):
+        # Yield (x, y) of every remaining dot, skipping empty bytes wholesale
+        for i, byte in enumerate(self.dots):
+            while byte:
+                low = byte & -byte
+                yield divmod((i << 3) + low.bit_length() - 1, self.width)[::-1]
+                byte ^= low
+
+    # Fixed-layout snapshot: scalars, Pac-Man, then the ghost arrays and the
+    # dot bitboard as raw bytes. Size depends only on the maze and ghost count.
+    STATE = struct.Struct("<qiI?IQQQHHBbb")
+
+    def snapshot(self):
+        pacman = self.pacman
+        return b"".join((
+            self.STATE.pack(self.score, self.lives, self.level, self.game_over,
+                            self.dots_left, self.mode_clock, self.ticks, self.rng.state,
+                            pacman.grid_x, pacman.grid_y, pacman.progress,
+                            DIR_INDEX[pacman.direction], DIR_INDEX[pacman.next_dir]),
+            self.ghost_x.tobytes(), self.ghost_y.tobytes(),
+            self.ghost_progress.tobytes(), self.ghost_dir.tobytes(),
+            self.dots,
+        ))
+
+    def restore(self, blob):
+        if len(blob) != self.STATE.size + 6 * self.num_ghosts + len(self.dots):
+            raise ValueError("snapshot does not match this maze and ghost count")
+        (self.score, self.lives, self.level, self.game_over, self.dots_left,
+         self.mode_clock, self.ticks, self.rng.state,
+         gx, gy, progress, direction, next_dir) = self.STATE.unpack_from(blob)
+        pacman = self.pacman
+        pacman.grid_x, pacman.grid_y, pacman.progress = gx, gy, progress
+        pacman.direction = ALL_DIRECTIONS[direction]
+        pacman.next_dir = ALL_DIRECTIONS[next_dir]
+
+        offset = self.STATE.size
+        for arr in (self.ghost_x, self.ghost_y, self.ghost_progress, self.ghost_dir, self.dots):
+            view = memoryview(arr).cast("B")
+            view[:] = blob[offset:offset + len(view)]
+            offset += len(view)
+
+        self.eaten = []
+        self.board_version += 1
+        for cell in self.ghost_bucket:
+            self.ghost_cells[cell].clear()
+        for i in range(self.num_ghosts):
+            cell = self.ghost_y[i] * self.width + self.ghost_x[i]
+            self.ghost_cells[cell].append(i)
+            self.ghost_bucket[i] = cell
+            self.rebucket_ghost(i)
+
+    def move_character(self, character):
+        if character.direction == STOP:
+            return
+        character.progress += character.speed
+        if character.progress < CELL_SIZE:
+            return
+
+        cell = character.grid_y * self.width + character.grid_x
+        target = self.table.neighbors[cell * 4 + DIR_INDEX[character.direction]]
+        if target < 0:
+            character.direction = STOP
+            character.progress = 0
+        else:
+            character.grid_y, character.grid_x = divmod(target, self.width)
+            character.progress -= CELL_SIZE
+
+    def steer_pacman(self, new_dir):
+        pacman = self.pacman
+        if pacman.progress == 0:
+            # Change direction immediately if the next cell is open
+            if self.table.moves[pacman.grid_y * self.width + pacman.grid_x] & DIR_BIT[new_dir]:
+                pacman.direction = new_dir
+        else:
+            # Queue direction change for next intersection
+            pacman.next_dir = new_dir
+
+    @property
+    def scattering(self):
+        return self.mode_clock % (SCATTER_TICKS + CHASE_TICKS) < SCATTER_TICKS
+
+    def ghost_target(self, ghost_index=0):
+        if self.scattering:
+            return self.paths.corners[ghost_index % 4]
+        return self.pacman.grid_y * self.width + self.pacman.grid_x
+
+    def move_ghosts(self):
+        width = self.width
+        moves = self.table.moves
+        neighbors = self.table.neighbors
+        xs, ys, progress, dirs = self.ghost_x, self.ghost_y, self.ghost_progress, self.ghost_dir
+        buckets, cells = self.ghost_bucket, self.ghost_cells
+        speed = self.ghost_speed
+        for i in range(self.num_ghosts):
+            cell = ys[i] * width + xs[i]
+            d = dirs[i]
+            if progress[i] == 0:
+                allowed = moves[cell] & ~REVERSE_BIT[d]
+                d = -1
+                if self.paths is not None:
+                    d = self.paths.step_toward(cell, self.ghost_target(i), allowed)
+                if d < 0:
+                    possible_dirs = MASK_INDICES[allowed]
+                    d = self.rng.choice(possible_dirs) if possible_dirs else STOP_INDEX
+                dirs[i] = d
+            if d == STOP_INDEX:
+                continue
+
+            p = progress[i] + speed
+            if p >= CELL_SIZE:
+                target = neighbors[cell * 4 + d]
+                if target < 0:
+                    dirs[i] = STOP_INDEX
+                    p = 0
+                else:
+                    ys[i], xs[i] = divmod(target, width)
+                    cell = target
+                    p -= CELL_SIZE
+            progress[i] = p
+
+            # Rebucket once the ghost is nearer the next cell than this one
+            if p * 2 >= CELL_SIZE and dirs[i] != STOP_INDEX:
+                cell = neighbors[cell * 4 + dirs[i]]
+            if cell != buckets[i]:
+                cells[buckets[i]].remove(i)
+                cells[cell].append(i)
+                buckets[i] = cell
+
+    def ghost_hit(self):
+        # Broadphase: each sprite is within half a cell of the cell it is
+        # bucketed in, so two CELL_SIZE rects can only overlap when those
+        # cells are at most one apart. Only ghosts in the 3x3 block around
+        # Pac-Man get the exact pixel test.
+        pacman = self.pacman
+        cell = pacman.grid_y * self.width + pacman.grid_x
+        if pacman.progress * 2 >= CELL_SIZE:
+            ahead = self.table.neighbors[cell * 4 + DIR_INDEX[pacman.direction]]
+            if ahead >= 0:
+                cell = ahead
+        px, py = pacman.pixel_pos()
+        cells = self.ghost_cells
+        for near in self.table.near[cell]:
+            for i in cells[near]:
+                gx, gy = self.ghost_pixel_pos(i)
+                if abs(px - gx) < CELL_SIZE and abs(py - gy) < CELL_SIZE:
+                    return True
+        return False
+
+    def check_collisions(self):
+        # Check dot collection
+        pacman = self.pacman
+        cell = pacman.grid_y * self.width + pacman.grid_x
+        bit = 1 << (cell & 7)
+        if self.dots[cell >> 3] & bit:
+            self.dots[cell >> 3] ^= bit
+            self.dots_left -= 1
+            self.eaten.append((pacman.grid_x, pacman.grid_y))
+            self.score += DOT_SCORE
+
+        # Ghost collision (same test as two CELL_SIZE rects overlapping)
+        if self.ghost_hit():
+            self.lives -= 1
+            if self.lives <= 0:
+                self.game_over = True
+            else:
+                pacman.place(self.pacman_start)
+                self.place_ghosts()
+
+    def step(self, action=None):
+        """Advance one tick. `action` is a direction tuple or None for no input.
+
+        Returns the score gained during the tick.
+        """
+        if self.game_over:
+            return 0
+        self.ticks += 1
+        self.mode_clock += 1
+        if action is not None and action != STOP:
+            self.steer_pacman(action)
+
+        score = self.score
+        pacman = self.pacman
+        self.move_character(pacman)
+        self.move_ghosts()
+        self.check_collisions()
+        if self.dots_left == 0:
+            self.next_level()
+
+        # Handle queued direction changes
+        if pacman.next_dir != STOP and pacman.progress == 0:
+            if self.table.moves[pacman.grid_y * self.width + pacman.grid_x] & DIR_BIT[pacman.next_dir]:
+                pacman.direction = pacman.next_dir
+                pacman.next_dir = STOP
+        return self.score - score
+
+    def first_contact(self, i, limit):
+        # Earliest tick t in 1..limit at which ghost i overlaps Pac-Man if both
+        # keep sliding at their current speeds, or 0 if they stay apart. Each
+        # axis offset is linear in t, so |a + b*t| < CELL_SIZE is an open
+        # interval of t per axis.
+        pacman = self.pacman
+        px, py = pacman.pixel_pos()
+        gx, gy = self.ghost_pixel_pos(i)
+        d = self.ghost_dir[i]
+        first, last = 1, limit
+        for a, b in ((px - gx, pacman.direction[0] * pacman.speed - DIR_DX[d] * self.ghost_speed),
+                     (py - gy, pacman.direction[1] * pacman.speed - DIR_DY[d] * self.ghost_speed)):
+            if b == 0:
+                if abs(a) >= CELL_SIZE:
+                    return 0
+                continue
+            lo, hi = sorted(((-CELL_SIZE - a) / b, (CELL_SIZE - a) / b))
+            first = max(first, math.floor(lo) + 1)
+            last = min(last, math.ceil(hi) - 1)
+        return first if first <= last else 0
+
+    def idle_ticks(self, limit):
+        """Number of upcoming ticks (at most ``limit``) in which nothing but
+        progress counters change: no cell arrival, ghost decision, dot, queued
+        turn or ghost contact."""
+        pacman = self.pacman
+        cell = pacman.grid_y * self.width + pacman.grid_x
+        if self.dots[cell >> 3] >> (cell & 7) & 1:
+            return 0
+        if pacman.direction != STOP:
+            limit = min(limit, (CELL_SIZE - 1 - pacman.progress) // pacman.speed)
+        elif pacman.next_dir != STOP and self.table.moves[cell] & DIR_BIT[pacman.next_dir]:
+            return 0
+
+        speed = self.ghost_speed
+        progress = self.ghost_progress
+        for i in range(self.num_ghosts):
+            if progress[i] == 0:
+                return 0
+            limit = min(limit, (CELL_SIZE - 1 - progress[i]) // speed)
+        if limit <= 0:
+            return 0
+
+        for i in range(self.num_ghosts):
+            contact = self.first_contact(i, limit)
+            if contact:
+                limit = contact - 1
+        return limit
+
+    def rebucket_ghost(self, i):
+        cell = self.ghost_y[i] * self.width + self.ghost_x[i]
+        if self.ghost_progress[i] * 2 >= CELL_SIZE and self.ghost_dir[i] != STOP_INDEX:
+            cell = self.table.neighbors[cell * 4 + self.ghost_dir[i]]
+        if cell != self.ghost_bucket[i]:
+            self.ghost_cells[self.ghost_bucket[i]].remove(i)
+            self.ghost_cells[cell].append(i)
+            self.ghost_bucket[i] = cell
+
+    def advance(self, max_ticks):
+        """Event-driven stepping: jump straight to the next tick where
+        something can happen, or take one regular step if that is now.
+
+        Equivalent to calling step() with no input for the returned number
+        of ticks.
+        """
+        if self.game_over:
+            return 0
+        k = self.idle_ticks(max_ticks)
+        if k == 0:
+            self.step()
+            return 1
+        self.ticks += k
+        self.mode_clock += k
+        if self.pacman.direction != STOP:
+            self.pacman.progress += self.pacman.speed * k
+        for i in range(self.num_ghosts):
+            self.ghost_progress[i] += self.ghost_speed * k
+            self.rebucket_ghost(i)
+        return k
+
+    def run_events(self, ticks, policy=None):
+        # Same results as run(), skipping idle ticks. The policy is consulted
+        # whenever Pac-Man sits exactly on a cell; it must return None while
+        # Pac-Man is between cells (random_policy does), since those ticks
+        # may be skipped.
+        done = 0
+        while done < ticks:
+            if self.game_over:
+                self.reset()
+            if policy and self.pacman.progress == 0:
+                self.step(policy(self))
+                done += 1
+            else:
+                done += self.advance(ticks - done)
+
+    def run(self, ticks, policy=None):
+        # Max-speed mode: no clock, no display. `policy(engine)` returns the
+        # action for each tick; restarts automatically on game over.
+        for _ in range(ticks):
+            if self.game_over:
+                self.reset()
+            self.step(policy(self) if policy else None)
+
+
+def random_policy(engine, _dirs=DIRECTIONS):
+    return engine.rng.choice(_dirs) if engine.pacman.progress == 0 else None
+
+
+if __name__ == "__main__":
+    # Benchmark: python packman_engine.py [ticks] [--events]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    ticks = int(args[0]) if args else 200_000
+    engine = PacmanEngine(seed=0)
+    run = engine.run_events if "--events" in sys.argv else engine.run
+    start = time.perf_counter()
+    run(ticks, random_policy)
+    elapsed = time.perf_counter() - start
+    print(f"{ticks} ticks in {elapsed:.2f}s ({ticks / elapsed:,.0f} ticks/sec)")
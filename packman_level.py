@@ -0,0 +1,226 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from packman_engine import MazeTable, PathTable, FieldPaths, MAX_PATH_CELLS
+
+# Level files: the maze as text, '#' for walls and '.' or ' ' for dotted
+# corridor, with one 'P' marking Pac-Man's spawn and one 'G' the ghosts'
+# (both dotted corridor too). Lines starting with ';' are comments. This is
+# the same layout packman_mazegen.py prints, so generated mazes can be saved
+# straight to a level file.
+#
+# Loading goes through a compiled cache next to the source (<level>.pmc)
+# holding the lookup tables the engine would otherwise derive on every
+# launch: wall mask, move masks, neighbor table, collision neighborhoods, dot
+# template and the chase AI's paths (all-pairs distance tables for levels
+# small enough, FieldPaths' corner distance fields above that). The cache is
+# memory-mapped and rebuilt only when the source text changes.
+
+CACHE_SUFFIX = ".pmc"
+MAGIC = b"PMLV"
+VERSION = 2
+# Which chase paths the cache holds
+PATH_TABLE = 1
+FIELD_PATHS = 2
+
+# magic, version, source SHA-1, width, height, walkable cells, collision
+# neighborhood entries, paths kind, Pac-Man x/y, ghost x/y
+HEADER = struct.Struct("<4sB20sHHIIBHHHH")
+
+
+def parse_level(text):
+    """Split level text into ``(maze, pacman_start, ghost_start)``."""
+    rows = [line.rstrip("\r\n") for line in text.splitlines() if line.strip() and not line.startswith(";")]
+    if not rows or any(len(row) != len(rows[0]) for row in rows):
+        raise ValueError("level rows must be non-empty and all the same width")
+    starts = {}
+    for y, row in enumerate(rows):
+        for marker in "PG":
+            x = row.find(marker)
+            if x >= 0:
+                if marker in starts or row.find(marker, x + 1) >= 0:
+                    raise ValueError(f"level has more than one '{marker}'")
+                starts[marker] = (x, y)
+    if len(starts) != 2:
+        raise ValueError("level needs one 'P' (Pac-Man) and one 'G' (ghost) spawn")
+    maze = [row.replace("P", ".").replace("G", ".") for row in rows]
+    return maze, starts["P"], starts["G"]
+
+
+def format_level(maze, pacman_start, ghost_start):
+    rows = [list(row) for row in maze]
+    rows[pacman_start[1]][pacman_start[0]] = "P"
+    rows[ghost_start[1]][ghost_start[0]] = "G"
+    return "\n".join("".join(row) for row in rows) + "\n"
+
+
+class NearTable:
+    # MazeTable.near stored flat: the block around cell c is
+    # cells[start[c]:start[c + 1]]
+    __slots__ = ("start", "cells")
+
+    def __init__(self, start, cells):
+        self.start = start
+        self.cells = cells
+
+    def __len__(self):
+        return len(self.start) - 1
+
+    def __getitem__(self, cell):
+        return self.cells[self.start[cell]:self.start[cell + 1]]
+
+
+class Level:
+    """A loaded level: maze rows, spawn points and ready-made tables.
+
+    Pass it to ``PacmanEngine(level=...)``; ``paths`` is a PathTable, or a
+    FieldPaths for levels over MAX_PATH_CELLS walkable cells.
+    """
+
+    def __init__(self, maze, pacman_start, ghost_start, table, paths, dot_template):
+        self.maze = maze
+        self.pacman_start = pacman_start
+        self.ghost_start = ghost_start
+        self.table = table
+        self.paths = paths
+        self.dot_template = dot_template
+
+
+def dot_template(maze, width, height):
+    template = bytearray((width * height + 7) // 8)
+    for cell, char in enumerate(char for row in maze for char in row):
+        if char in (".", " "):
+            template[cell >> 3] |= 1 << (cell & 7)
+    return template
+
+
+def compile_level(maze, pacman_start, ghost_start, digest):
+    """Build the cache file contents for a parsed level."""
+    table = MazeTable(maze)
+    cells = table.width * table.height
+    walkable = sum(table.walkable)
+    paths_kind = PATH_TABLE if walkable <= MAX_PATH_CELLS else FIELD_PATHS
+
+    near_start = array("i", [0])
+    near_cells = array("i")
+    for block in table.near:
+        near_cells.extend(block)
+        near_start.append(len(near_cells))
+
+    sections = [bytes(table.walkable), bytes(table.moves), bytes(table.intersection),
+                table.neighbors.tobytes(), near_start.tobytes(), near_cells.tobytes(),
+                bytes(dot_template(maze, table.width, table.height))]
+    if paths_kind == PATH_TABLE:
+        paths = PathTable(table)
+        sections += [paths.cells.tobytes(), paths.index.tobytes(), paths.dist.tobytes(),
+                     bytes(paths.next_dir), array("i", paths.corners).tobytes()]
+    else:
+        paths = FieldPaths(table)
+        sections += [array("i", paths.corners).tobytes(), paths.corner_dist.tobytes()]
+
+    out = bytearray(HEADER.pack(MAGIC, VERSION, digest, table.width, table.height, walkable,
+                                len(near_cells), paths_kind, *pacman_start, *ghost_start))
+    for section in sections:
+        out += bytes(-len(out) % 8)  # keep every table 8-byte aligned
+        out += section
+    return bytes(out)
+
+
+def sections(width, height, walkable, near_total, paths_kind):
+    # (format, count) of every table in the cache, in file order
+    cells = width * height
+    layout = [("B", cells), ("B", cells), ("B", cells), ("i", cells * 4),
+              ("i", cells + 1), ("i", near_total), ("B", (cells + 7) // 8)]
+    if paths_kind == PATH_TABLE:
+        layout += [("i", walkable), ("i", cells), ("H", walkable * walkable),
+                   ("B", walkable * walkable), ("i", 4)]
+    elif paths_kind == FIELD_PATHS:
+        layout += [("i", 4), ("i", 4 * cells)]
+    else:
+        raise ValueError(f"unknown paths kind {paths_kind}")
+    return layout
+
+
+def cache_size(header):
+    # Exact file size a cache with this (unpacked) header must have
+    size = HEADER.size
+    for fmt, count in sections(*header[3:8]):
+        size += -size % 8 + count * struct.calcsize(fmt)
+    return size
+
+
+def map_tables(buf, maze):
+    # Wrap MazeTable and the chase paths around memoryviews into the mapped
+    # cache instead of running their constructors
+    header = HEADER.unpack_from(buf)
+    (_, _, _, width, height, walkable, near_total, paths_kind, px, py, gx, gy) = header
+    views = []
+    offset = HEADER.size
+    for fmt, count in sections(width, height, walkable, near_total, paths_kind):
+        offset += -offset % 8
+        size = count * struct.calcsize(fmt)
+        views.append(buf[offset:offset + size].cast(fmt))
+        offset += size
+
+    table = MazeTable.__new__(MazeTable)
+    table.width, table.height = width, height
+    table.walkable, table.moves, table.intersection, table.neighbors, near_start, near_cells, dots = views[:7]
+    table.near = NearTable(near_start, near_cells)
+
+    if paths_kind == PATH_TABLE:
+        paths = PathTable.__new__(PathTable)
+        paths.table = table
+        paths.n = walkable
+        paths.cells, paths.index, paths.dist, paths.next_dir, corners = views[7:]
+        paths.corners = list(corners)
+    else:
+        corners, corner_dist = views[7:]
+        paths = FieldPaths(table, list(corners), corner_dist)
+    return Level(maze, (px, py), (gx, gy), table, paths, dots)
+
+
+def load_level(path):
+    """Load a level through its binary cache, (re)compiling the cache if it
+    is missing, stale or unreadable."""
+    with open(path, "rb") as f:
+        source = f.read()
+    digest = hashlib.sha1(source).digest()
+    maze, pacman_start, ghost_start = parse_level(source.decode())
+
+    cache_path = os.path.splitext(path)[0] + CACHE_SUFFIX
+    try:
+        with open(cache_path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = HEADER.unpack_from(buf)
+        # A truncated or padded file fails the size check and is rebuilt
+        if header[:3] == (MAGIC, VERSION, digest) and cache_size(header) == len(buf):
+            return map_tables(memoryview(buf), maze)
+    except (OSError, ValueError, TypeError, struct.error):
+        pass
+
+    data = compile_level(maze, pacman_start, ghost_start, digest)
+    try:
+        # Write then rename so a crashed build never leaves a torn cache
+        with open(cache_path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(cache_path + ".tmp", cache_path)
+    except OSError:
+        pass  # Read-only location: use the freshly built tables uncached
+    return map_tables(memoryview(data), maze)
+
+
+if __name__ == "__main__":
+    # Load timing: python packman_level.py LEVEL
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "levels", "classic.txt")
+    start = time.perf_counter()
+    level = load_level(path)
+    elapsed = time.perf_counter() - start
+    table = level.table
+    paths = "distance tables" if isinstance(level.paths, PathTable) else "corner distance fields"
+    print(f"{path}: {table.width}x{table.height}, {sum(table.walkable)} open cells, "
+          f"{paths} cached, loaded in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,69 @@
+import random
+import sys
+
+from packman_level import format_level
+
+# Procedural Pac-Man mazes in the same row-string format as packman_engine.MAZE
+# ('#' wall, '.' dot), for stress-testing far beyond the 19-column arcade map.
+
+
+def generate_maze(width, height, seed=None, braid=1.0):
+    """Carve a width x height maze and return ``(maze, pacman_start, ghost_start)``.
+
+    Corridors are carved on the odd lattice with an iterative backtracker, so
+    even sizes are rounded down to the next odd number. ``braid`` is the
+    chance of knocking each dead end through into a neighboring corridor;
+    the default 1.0 leaves no dead ends, like an arcade maze.
+    """
+    rng = random.Random(seed)
+    width = max(5, width - (width % 2 == 0))
+    height = max(5, height - (height % 2 == 0))
+    grid = [bytearray(b"#" * width) for _ in range(height)]
+
+    # Iterative recursive-backtracker over the odd cells
+    grid[1][1] = ord(".")
+    stack = [(1, 1)]
+    steps = ((2, 0), (-2, 0), (0, 2), (0, -2))
+    while stack:
+        x, y = stack[-1]
+        options = [(x + dx, y + dy, x + dx // 2, y + dy // 2) for dx, dy in steps
+                   if 0 < x + dx < width - 1 and 0 < y + dy < height - 1
+                   and grid[y + dy][x + dx] == ord("#")]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny, wx, wy = rng.choice(options)
+        grid[wy][wx] = grid[ny][nx] = ord(".")
+        stack.append((nx, ny))
+
+    # Braid: open dead ends into a neighboring corridor to make loops
+    for y in range(1, height - 1, 2):
+        for x in range(1, width - 1, 2):
+            exits = [(dx, dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                     if grid[y + dy][x + dx] == ord(".")]
+            if len(exits) != 1 or rng.random() >= braid:
+                continue
+            walls = [(x + dx, y + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                     if 0 < x + 2 * dx < width - 1 and 0 < y + 2 * dy < height - 1
+                     and grid[y + dy][x + dx] == ord("#")]
+            if walls:
+                wx, wy = rng.choice(walls)
+                grid[wy][wx] = ord(".")
+
+    maze = [row.decode() for row in grid]
+    # Spawns on the odd lattice (always open): Pac-Man bottom-center, ghost in the middle
+    pacman_start = (width // 2 | 1, height - 2)
+    ghost_start = (width // 2 | 1, height // 2 | 1)
+    if ghost_start == pacman_start:
+        # At height 5 the middle row is the bottom one: spawn the ghost on top
+        ghost_start = (ghost_start[0], 1)
+    return maze, pacman_start, ghost_start
+
+
+if __name__ == "__main__":
+    # Preview: python packman_mazegen.py [width] [height] [seed]
+    w = int(sys.argv[1]) if len(sys.argv) > 1 else 31
+    h = int(sys.argv[2]) if len(sys.argv) > 2 else 21
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    # The output is a level file: python packman_mazegen.py 201 201 > levels/big.txt
+    print(format_level(*generate_maze(w, h, seed)), end="")
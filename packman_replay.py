@@ -0,0 +1,125 @@
+import argparse
+import random
+import struct
+import sys
+import time
+import zlib
+
+from packman_engine import PacmanEngine, DIRECTIONS, MASK64
+
+# Deterministic Pac-Man session recording and replay. A recording is the
+# engine seed and settings plus one input code per tick (zlib-compressed), so
+# replaying it headlessly re-executes the session exactly.
+
+# Input codes: 0-3 index DIRECTIONS, then no input, then a restart (which
+# does not consume a tick)
+NO_INPUT = 4
+RESTART = 5
+ACTIONS = DIRECTIONS + [None]
+CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+MAGIC = b"PMRC"
+VERSION = 3
+# magic, version, seed, chase AI, ghosts, final score, final lives, final ticks, body length
+HEADER = struct.Struct("<4sBQ?HqiQI")
+
+
+class Recorder:
+    def __init__(self, path, seed=None, ghost_ai="random", num_ghosts=1):
+        self.path = path
+        # The engine RNG only uses the seed's low 64 bits, so masking it keeps
+        # the session identical and lets any int (negative too) fit the header
+        self.seed = random.getrandbits(63) if seed is None else seed & MASK64
+        self.engine = PacmanEngine(seed=self.seed, ghost_ai=ghost_ai, num_ghosts=num_ghosts)
+        self.codes = bytearray()
+
+    def step(self, action=None):
+        self.codes.append(CODES.get(action, NO_INPUT))
+        return self.engine.step(action)
+
+    def reset(self):
+        self.codes.append(RESTART)
+        self.engine.reset()
+
+    def save(self):
+        engine = self.engine
+        body = zlib.compress(bytes(self.codes), 9)
+        with open(self.path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.seed, engine.ghost_ai == "chase",
+                                engine.num_ghosts, engine.score, engine.lives, engine.ticks, len(body)))
+            f.write(body)
+
+
+def load(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, seed, chase, num_ghosts, score, lives, ticks, size = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} Pac-Man recording")
+    codes = zlib.decompress(data[HEADER.size:HEADER.size + size])
+    header = {"seed": seed, "ghost_ai": "chase" if chase else "random", "num_ghosts": num_ghosts,
+              "score": score, "lives": lives, "ticks": ticks}
+    return header, codes
+
+
+def replay(path, render_every=0):
+    """Re-execute a recording headlessly at full speed.
+
+    With ``render_every`` N > 0, opens a window and draws every Nth tick.
+    Returns the engine and whether the final score, lives and tick count
+    match the ones stored in the recording.
+    """
+    header, codes = load(path)
+    engine = PacmanEngine(seed=header["seed"], ghost_ai=header["ghost_ai"],
+                          num_ghosts=header["num_ghosts"])
+
+    renderer = None
+    if render_every:
+        import pygame
+        from packman import Renderer, WIDTH, HEIGHT
+        pygame.init()
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Pac-Man replay")
+        renderer = Renderer(screen, pygame.font.Font(None, 36))
+
+    step = engine.step
+    i = 0
+    n = len(codes)
+    while i < n:
+        code = codes[i]
+        if code == RESTART:
+            engine.reset()
+            i += 1
+        elif code == NO_INPUT and not renderer:
+            # Idle stretches go through the event-driven fast path
+            run = i
+            while run < n and codes[run] == NO_INPUT:
+                run += 1
+            ticks = run - i
+            while ticks and not engine.game_over:
+                ticks -= engine.advance(ticks)
+            i = run
+        else:
+            step(ACTIONS[code])
+            i += 1
+            if renderer and i % render_every == 0:
+                pygame.event.pump()
+                renderer.draw(engine)
+
+    ok = (engine.score, engine.lives, engine.ticks) == (header["score"], header["lives"], header["ticks"])
+    return engine, ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded Pac-Man session")
+    parser.add_argument("recording")
+    parser.add_argument("--render-every", type=int, default=0, metavar="N",
+                        help="draw every Nth tick instead of replaying headlessly")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    engine, ok = replay(args.recording, args.render_every)
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {engine.ticks} ticks in {elapsed:.2f}s ({engine.ticks / elapsed:,.0f} ticks/sec)")
+    print(f"Score: {engine.score}  Lives: {engine.lives}  -> {'match' if ok else 'MISMATCH'}")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,353 @@
+import argparse
+import asyncio
+import random
+import struct
+import time
+from array import array
+
+from packman_engine import PacmanEngine, FPS
+from packman_replay import ACTIONS, NO_INPUT, RESTART
+
+# Authoritative Pac-Man server: one asyncio process runs many sessions at a
+# fixed tick rate and streams each client only what changed. Clients send
+# nothing but input codes (packman_replay's: 0-3 a direction, 4 no input,
+# 5 restart); the held input applies to every tick until the next code.
+#
+# Server to client frames are a 3-byte header (payload length, type). A
+# keyframe carries the full state; after that each delta carries the ticks
+# elapsed since the previous frame, any changed score/lives, sprite motion as
+# signed byte offsets (absolute positions after a respawn or tunnel wrap)
+# and the cells eaten since. Ticks where nothing changed send nothing.
+
+FRAME = struct.Struct("<HB")
+KEYFRAME = 0
+DELTA = 1
+# tick, score, lives, game over, ghosts, maze width, dot bitfield length;
+# followed by sprite positions as H pairs (ghosts, then Pac-Man) and the
+# dot bitfield
+KEY_HEADER = struct.Struct("<QqB?HHI")
+# flags, ticks since the previous frame
+DELTA_HEADER = struct.Struct("<BB")
+SCORE_CHANGED = 1
+LIVES_CHANGED = 2  # lives and game over follow as <B?
+MOVED = 4          # one b pair per sprite follows
+ABSOLUTE = 8       # ... as H pairs instead
+EATEN = 16         # count B, then one H pair per eaten cell
+SCORE = struct.Struct("<q")
+LIVES = struct.Struct("<B?")
+
+# Stop writing to clients this far behind; they get a keyframe once drained
+MAX_BUFFER = 64 * 1024
+
+
+class Session:
+    def __init__(self, writer, seed, ghost_ai, num_ghosts):
+        self.writer = writer
+        self.engine = PacmanEngine(seed=seed, ghost_ai=ghost_ai, num_ghosts=num_ghosts)
+        self.action = None
+        self.restart = False
+        self.need_keyframe = True
+        # What the client last saw
+        self.sent_tick = 0
+        self.sent_score = 0
+        self.sent_lives = (0, False)
+        self.sent_positions = []
+        self.sent_eaten = 0
+        self.board_version = None
+
+    def input(self, code):
+        if code == RESTART:
+            self.restart = True
+        elif code <= NO_INPUT:
+            self.action = ACTIONS[code]
+
+    def positions(self):
+        engine = self.engine
+        flat = []
+        for i in range(engine.num_ghosts):
+            flat.extend(engine.ghost_pixel_pos(i))
+        flat.extend(engine.pacman.pixel_pos())
+        return flat
+
+    def keyframe(self):
+        engine = self.engine
+        self.need_keyframe = False
+        self.sent_tick = engine.ticks
+        self.sent_score = engine.score
+        self.sent_lives = (engine.lives, engine.game_over)
+        self.sent_positions = self.positions()
+        self.sent_eaten = len(engine.eaten)
+        self.board_version = engine.board_version
+        payload = b"".join((
+            KEY_HEADER.pack(engine.ticks, engine.score, engine.lives, engine.game_over,
+                            engine.num_ghosts, engine.width, len(engine.dots)),
+            array("H", self.sent_positions).tobytes(),
+            engine.dots,
+        ))
+        return FRAME.pack(len(payload), KEYFRAME) + payload
+
+    def delta(self):
+        # None if the client is already up to date
+        engine = self.engine
+        if engine.board_version != self.board_version or engine.ticks - self.sent_tick > 255:
+            return self.keyframe()
+
+        flags = 0
+        parts = []
+        if engine.score != self.sent_score:
+            flags |= SCORE_CHANGED
+            parts.append(SCORE.pack(engine.score))
+            self.sent_score = engine.score
+        lives = (engine.lives, engine.game_over)
+        if lives != self.sent_lives:
+            flags |= LIVES_CHANGED
+            parts.append(LIVES.pack(*lives))
+            self.sent_lives = lives
+
+        positions = self.positions()
+        if positions != self.sent_positions:
+            offsets = [new - old for new, old in zip(positions, self.sent_positions)]
+            if all(-128 <= d < 128 for d in offsets):
+                flags |= MOVED
+                parts.append(array("b", offsets).tobytes())
+            else:
+                flags |= MOVED | ABSOLUTE
+                parts.append(array("H", positions).tobytes())
+            self.sent_positions = positions
+
+        eaten = engine.eaten[self.sent_eaten:self.sent_eaten + 255]
+        if eaten:
+            flags |= EATEN
+            parts.append(bytes((len(eaten),)))
+            parts.append(array("H", [v for cell in eaten for v in cell]).tobytes())
+            self.sent_eaten += len(eaten)
+
+        if not flags:
+            return None
+        payload = DELTA_HEADER.pack(flags, engine.ticks - self.sent_tick) + b"".join(parts)
+        self.sent_tick = engine.ticks
+        return FRAME.pack(len(payload), DELTA) + payload
+
+    def tick(self):
+        # Step the game one tick and return the bytes written for it
+        engine = self.engine
+        if self.restart:
+            self.restart = False
+            if engine.game_over:
+                engine.reset()
+        engine.step(self.action)
+
+        transport = self.writer.transport
+        if transport.is_closing():
+            return 0
+        if transport.get_write_buffer_size() > MAX_BUFFER:
+            self.need_keyframe = True
+            return 0
+        frame = self.keyframe() if self.need_keyframe else self.delta()
+        if frame:
+            self.writer.write(frame)
+            return len(frame)
+        return 0
+
+
+class PacmanServer:
+    """Runs every connected session in one fixed-rate tick loop."""
+
+    def __init__(self, ghost_ai="random", num_ghosts=1, tick_rate=FPS):
+        self.ghost_ai = ghost_ai
+        self.num_ghosts = num_ghosts
+        self.tick_rate = tick_rate
+        self.sessions = []
+        self.seeds = random.Random()
+        # Totals for the stats line: session-ticks run, time spent, bytes sent
+        self.session_ticks = 0
+        self.tick_time = 0.0
+        self.bytes_sent = 0
+
+    async def handle(self, reader, writer):
+        session = Session(writer, self.seeds.getrandbits(63), self.ghost_ai, self.num_ghosts)
+        self.sessions.append(session)
+        try:
+            while True:
+                data = await reader.read(256)
+                if not data:
+                    break
+                for code in data:
+                    session.input(code)
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions.remove(session)
+            writer.close()
+
+    def tick(self):
+        start = time.perf_counter()
+        sent = 0
+        for session in self.sessions:
+            sent += session.tick()
+        self.tick_time += time.perf_counter() - start
+        self.session_ticks += len(self.sessions)
+        self.bytes_sent += sent
+
+    async def tick_loop(self):
+        loop = asyncio.get_running_loop()
+        step = 1.0 / self.tick_rate
+        next_tick = loop.time()
+        while True:
+            self.tick()
+            next_tick += step
+            delay = next_tick - loop.time()
+            if delay < -0.25:
+                # Too far behind to catch up; drop the backlog
+                next_tick = loop.time()
+            await asyncio.sleep(max(delay, 0))
+
+    def stats(self):
+        n = self.session_ticks or 1
+        per_tick = self.tick_time / n
+        return (f"{self.session_ticks:,} session-ticks, {per_tick * 1e6:.1f} us and "
+                f"{self.bytes_sent / n:.1f} bytes per session-tick "
+                f"(~{1 / (per_tick * self.tick_rate) if per_tick else 0:,.0f} sessions per core at {self.tick_rate} Hz)")
+
+
+class ClientState:
+    """A client's mirror of its session, rebuilt from server frames."""
+
+    def __init__(self):
+        self.ticks = 0
+        self.score = 0
+        self.lives = 0
+        self.game_over = False
+        self.positions = []
+        self.width = 0
+        self.dots = bytearray()
+        self.frames = 0
+        self.bytes = 0
+
+    def apply(self, kind, payload):
+        self.frames += 1
+        self.bytes += FRAME.size + len(payload)
+        if kind == KEYFRAME:
+            (self.ticks, self.score, self.lives, self.game_over,
+             ghosts, self.width, dot_bytes) = KEY_HEADER.unpack_from(payload)
+            offset = KEY_HEADER.size
+            count = 2 * (ghosts + 1)
+            self.positions = list(array("H", payload[offset:offset + 2 * count]))
+            offset += 2 * count
+            self.dots = bytearray(payload[offset:offset + dot_bytes])
+            return
+
+        flags, ticks = DELTA_HEADER.unpack_from(payload)
+        self.ticks += ticks
+        offset = DELTA_HEADER.size
+        if flags & SCORE_CHANGED:
+            (self.score,) = SCORE.unpack_from(payload, offset)
+            offset += SCORE.size
+        if flags & LIVES_CHANGED:
+            self.lives, self.game_over = LIVES.unpack_from(payload, offset)
+            offset += LIVES.size
+        if flags & MOVED:
+            count = len(self.positions)
+            if flags & ABSOLUTE:
+                self.positions = list(array("H", payload[offset:offset + 2 * count]))
+                offset += 2 * count
+            else:
+                offsets = array("b", payload[offset:offset + count])
+                self.positions = [p + d for p, d in zip(self.positions, offsets)]
+                offset += count
+        if flags & EATEN:
+            eaten = payload[offset]
+            cells = array("H", payload[offset + 1:offset + 1 + 4 * eaten])
+            for i in range(0, len(cells), 2):
+                cell = cells[i + 1] * self.width + cells[i]
+                self.dots[cell >> 3] &= ~(1 << (cell & 7))
+
+
+async def read_frame(reader):
+    length, kind = FRAME.unpack(await reader.readexactly(FRAME.size))
+    return kind, await reader.readexactly(length)
+
+
+async def bot_client(host, port, state, rng, ready):
+    # Loopback test client: random held inputs, restarts on game over
+    reader, writer = await asyncio.open_connection(host, port)
+    state.apply(*await read_frame(reader))
+    ready.set()
+    try:
+        while True:
+            state.apply(*await read_frame(reader))
+            if state.game_over:
+                writer.write(bytes((RESTART,)))
+            elif rng.random() < 0.05:
+                writer.write(bytes((rng.randrange(NO_INPUT + 1),)))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def loopback(clients, seconds, ghost_ai, num_ghosts, tick_rate):
+    server = PacmanServer(ghost_ai, num_ghosts, tick_rate)
+    listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    ticker = asyncio.create_task(server.tick_loop())
+
+    # Connect one at a time so sessions[i] belongs to states[i]
+    rng = random.Random(0)
+    states = []
+    tasks = []
+    for _ in range(clients):
+        state = ClientState()
+        ready = asyncio.Event()
+        tasks.append(asyncio.create_task(bot_client("127.0.0.1", port, state, rng, ready)))
+        await ready.wait()
+        states.append(state)
+    sessions = list(server.sessions)
+
+    await asyncio.sleep(seconds)
+    ticker.cancel()
+    # Let the clients drain what was sent, then check their mirrors
+    await asyncio.sleep(0.2)
+    mismatched = 0
+    for session, state in zip(sessions, states):
+        engine = session.engine
+        if (state.score, state.lives, state.positions, bytes(state.dots)) != \
+                (engine.score, engine.lives, session.positions(), bytes(engine.dots)):
+            mismatched += 1
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    # Server handlers see the disconnects and exit
+    while server.sessions:
+        await asyncio.sleep(0.01)
+    listener.close()
+    await listener.wait_closed()
+    return server, mismatched
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pac-Man session server")
+    parser.add_argument("mode", choices=["serve", "loopback"],
+                        help="serve on a local socket, or run bot clients against an in-process server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7788)
+    parser.add_argument("--rate", type=int, default=FPS, help="ticks per second")
+    parser.add_argument("--chase", action="store_true", help="use the chase/scatter ghost AI")
+    parser.add_argument("--ghosts", type=int, default=1, help="number of ghosts")
+    parser.add_argument("--clients", type=int, default=100, help="loopback: number of bot clients")
+    parser.add_argument("--seconds", type=float, default=5, help="loopback: how long to run")
+    args = parser.parse_args()
+    ghost_ai = "chase" if args.chase else "random"
+
+    if args.mode == "serve":
+        async def serve():
+            server = PacmanServer(ghost_ai, args.ghosts, args.rate)
+            listener = await asyncio.start_server(server.handle, args.host, args.port)
+            print(f"Serving Pac-Man on {args.host}:{args.port} at {args.rate} Hz")
+            async with listener:
+                await server.tick_loop()
+        asyncio.run(serve())
+    else:
+        server, mismatched = asyncio.run(loopback(args.clients, args.seconds, ghost_ai, args.ghosts, args.rate))
+        print(server.stats())
+        print(f"{args.clients - mismatched}/{args.clients} client mirrors match the server")
@@ -0,0 +1,148 @@
+import argparse
+import random
+import time
+
+from snake_core import SnakeBody
+
+# Snake autopilot that fills the board: it follows a precomputed Hamiltonian
+# cycle and cuts ahead along it toward the food while the snake is short.
+# Every body segment stays in cycle order between the tail and the head, so
+# any cell further along the cycle than the head but short of the tail is
+# free, and a cut that lands well short of the tail can't close the snake in.
+#
+# The games test the new head against the body before dropping the tail, so
+# the head can never follow straight into the cell the tail is leaving: the
+# head has to keep at least one free cell between itself and the tail. Cells
+# skipped by a cut stay empty until the tail passes them, and if the food
+# kept appearing right in front of the head the tail would stop moving and
+# the gap could close while they are still empty. Cuts therefore land at
+# least half a board short of the tail, so that would take half a board's
+# worth of spawns in a row right in front of the head; cutting stops by
+# itself once the snake covers half the board.
+
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+
+
+class HamiltonianCycle:
+    """A cycle visiting every cell of a width x height grid once.
+
+    ``cells[i]`` is the i-th cell along the cycle and ``order[y * width + x]``
+    a cell's position on it. Needs an even width or height.
+    """
+
+    def __init__(self, width, height):
+        if height % 2 == 0:
+            path = self.build(width, height)
+        elif width % 2 == 0:
+            path = [(x, y) for y, x in self.build(height, width)]
+        else:
+            raise ValueError("a Hamiltonian cycle needs an even width or height")
+        self.width = width
+        self.cells = path
+        self.order = [0] * (width * height)
+        for i, (x, y) in enumerate(path):
+            self.order[y * width + x] = i
+
+    @staticmethod
+    def build(width, height):
+        # Along the top row, boustrophedon down columns 1.., back up column 0
+        path = [(x, 0) for x in range(width)]
+        for y in range(1, height):
+            xs = range(width - 1, 0, -1) if y % 2 else range(1, width)
+            path.extend((x, y) for x in xs)
+        path.extend((0, y) for y in range(height - 1, 0, -1))
+        return path
+
+
+class Autopilot:
+    """Picks the snake's next direction in O(1) from the cycle positions.
+
+    ``wrap`` says whether moving off an edge comes back on the other side,
+    which gives cells on the border extra shortcut neighbors.
+    """
+
+    def __init__(self, width, height, wrap=True):
+        self.width = width
+        self.size = width * height
+        self.cycle = HamiltonianCycle(width, height)
+        self.neighbors = []
+        for y in range(height):
+            for x in range(width):
+                options = []
+                for dx, dy in (UP, DOWN, LEFT, RIGHT):
+                    nx, ny = x + dx, y + dy
+                    if wrap:
+                        nx, ny = nx % width, ny % height
+                    elif not (0 <= nx < width and 0 <= ny < height):
+                        continue
+                    options.append(((dx, dy), (nx, ny), self.cycle.order[ny * width + nx]))
+                self.neighbors.append(options)
+
+    def next_direction(self, body, food, length):
+        """Direction for the next move of ``body`` (a SnakeBody) toward
+        ``food`` (a cell or None); ``length`` is the length it is growing to."""
+        order = self.cycle.order
+        size = self.size
+        width = self.width
+        hx, hy = body.head
+        tx, ty = body.tail
+        head = order[hy * width + hx]
+        to_tail = (order[ty * width + tx] - head) % size or size
+        to_food = (order[food[1] * width + food[0]] - head) % size if food else 1
+        # Land at least half a board short of the tail once the segments
+        # still to be grown are in
+        room = to_tail - (length - len(body)) - size // 2
+
+        best, best_dist = None, 0
+        for direction, cell, position in self.neighbors[hy * width + hx]:
+            dist = (position - head) % size
+            if dist == 1 and best is None:
+                best, best_dist = direction, 1  # the cycle's own next step
+            elif best_dist < dist <= to_food and dist < room and cell not in body:
+                best, best_dist = direction, dist
+        return best
+
+
+def play(width, height, seed=None, wrap=True):
+    """Run the autopilot headlessly with snake_claude-3-5-sonnet.py's rules
+    until the snake fills the board; returns (moves, final length)."""
+    rng = random.Random(seed)
+    pilot = Autopilot(width, height, wrap)
+    body = SnakeBody(width, height, (width // 2, height // 2))
+    length = 1
+    food = body.random_free_cell(rng)
+    moves = 0
+    while food is not None:
+        dx, dy = pilot.next_direction(body, food, length)
+        x, y = body.head
+        new = ((x + dx) % width, (y + dy) % height)
+        if body.hits(new, skip=3):
+            raise RuntimeError(f"autopilot crashed after {moves} moves at length {length}")
+        body.push(new)
+        body.trim(length)
+        moves += 1
+        if new == food:
+            length += 1
+            food = body.random_free_cell(rng)
+    return moves, len(body)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill a snake board with the Hamiltonian-cycle autopilot")
+    parser.add_argument("--width", type=int, default=40)
+    parser.add_argument("--height", type=int, default=30)
+    parser.add_argument("--games", type=int, default=1)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    total = 0
+    start = time.perf_counter()
+    for game in range(args.games):
+        moves, length = play(args.width, args.height, None if args.seed is None else args.seed + game)
+        total += moves
+        print(f"Game {game + 1}: filled {args.width}x{args.height} (length {length}) in {moves:,} moves")
+    elapsed = time.perf_counter() - start
+    print(f"{total:,} moves in {elapsed:.2f}s ({total / elapsed:,.0f} moves/sec)")
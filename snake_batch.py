@@ -0,0 +1,148 @@
+import sys
+import time
+
+import numpy as np
+
+# Vectorized snake: N independent boards held in NumPy arrays and advanced
+# together by one step() call, with the class-based game's rules
+# (snake_claude-3-5-sonnet.py): wraparound grid, growth on food, and a reset
+# when the head runs into its own body.
+#
+# Each board keeps its body as a ring buffer of cells (head at ptr - 1) next to
+# a uint8 occupancy grid, so a move only touches the head and tail cells and
+# the body observation plane is the grid itself.
+
+# Action indices; reversing onto the neck is ignored like in the games
+UP, DOWN, LEFT, RIGHT = range(4)
+KEEP = 4  # no input: keep the current heading
+DIR_DX = np.array([0, 0, -1, 1])
+DIR_DY = np.array([-1, 1, 0, 0])
+
+
+class BatchSnake:
+    """``n`` snake boards stepped in lockstep.
+
+    step() takes one action per board (UP/DOWN/LEFT/RIGHT or KEEP) and returns
+    ``(observations, rewards, dones)``: +1 for food, -1 for a self-collision.
+    A board ends on a collision or when the snake fills it, and is reset
+    automatically.
+    """
+
+    def __init__(self, n, width=40, height=30, seed=None):
+        # On a 3-cell axis the wraparound lets the head re-enter the segment
+        # two behind it, which the `positions[3:]` rule allows; the body would
+        # then hold the same cell twice and could outgrow the board
+        if width < 4 or height < 4:
+            raise ValueError("boards must be at least 4x4")
+        self.n = n
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        self.rng = np.random.default_rng(seed)
+        self.rows = np.arange(n)
+
+        self.occupancy = np.zeros((n, self.cells), dtype=np.uint8)
+        # One spare slot so pushing a head never overwrites the tail it replaces
+        self.ring = np.zeros((n, self.cells + 1), dtype=np.int64)
+        self.ptr = np.zeros(n, dtype=np.int64)
+        self.head = np.empty(n, dtype=np.int64)
+        self.direction = np.empty(n, dtype=np.int64)
+        self.length = np.empty(n, dtype=np.int64)
+        self.body_len = np.empty(n, dtype=np.int64)
+        self.food = np.empty(n, dtype=np.int64)
+        self.score = np.empty(n, dtype=np.int64)
+        self.reset()
+
+    def reset(self):
+        self.reset_boards(np.ones(self.n, dtype=bool))
+        return self.observe()
+
+    def reset_boards(self, mask):
+        rows = self.rows[mask]
+        self.occupancy[rows] = 0
+        self.head[rows] = (self.height // 2) * self.width + self.width // 2
+        self.occupancy[rows, self.head[rows]] = 1
+        self.ring[rows, 0] = self.head[rows]
+        self.ptr[rows] = 1
+        self.direction[rows] = self.rng.integers(0, 4, size=len(rows))
+        self.length[rows] = 1
+        self.body_len[rows] = 1
+        self.score[rows] = 0
+        self.spawn_food(rows)
+
+    def spawn_food(self, rows):
+        # Uniform over free cells: the highest random key among them.
+        # Returns the rows whose board is full (no food can spawn).
+        if not len(rows):
+            return rows
+        free = self.occupancy[rows] == 0
+        keys = np.where(free, self.rng.random(free.shape), -1.0)
+        self.food[rows] = keys.argmax(axis=1)
+        return rows[~free.any(axis=1)]
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64)
+        # Turn unless keeping course or reversing (UP^1 == DOWN, LEFT^1 == RIGHT)
+        turn = (actions < 4) & (actions != self.direction ^ 1)
+        self.direction = np.where(turn, actions, self.direction)
+
+        x = (self.head % self.width + DIR_DX[self.direction]) % self.width
+        y = (self.head // self.width + DIR_DY[self.direction]) % self.height
+        new = y * self.width + x
+
+        # Same as `new in positions[3:]`: occupied by something other than
+        # the three segments nearest the head
+        hits = self.occupancy[self.rows, new].astype(np.int64)
+        for k in range(3):
+            segment = self.ring[self.rows, (self.ptr - 1 - k) % (self.cells + 1)]
+            hits -= (segment == new) & (k < self.body_len)
+        crashed = hits > 0
+
+        # Push the new head, then drop the tail if the snake isn't growing
+        self.ring[self.rows, self.ptr % (self.cells + 1)] = new
+        self.ptr += 1
+        self.occupancy[self.rows, new] += 1
+        self.head = new
+        self.body_len += 1
+        trim = self.body_len > self.length
+        tail = self.ring[self.rows, (self.ptr - self.body_len) % (self.cells + 1)]
+        self.occupancy[self.rows[trim], tail[trim]] -= 1
+        self.body_len -= trim
+
+        ate = (new == self.food) & ~crashed
+        self.length += ate
+        self.score += ate
+        full = self.spawn_food(self.rows[ate])
+
+        rewards = ate.astype(np.float32)
+        rewards[crashed] = -1.0
+        dones = crashed.copy()
+        dones[full] = True
+        if dones.any():
+            self.reset_boards(dones)
+        return self.observe(), rewards, dones
+
+    def observe(self):
+        """(n, 3, height, width) uint8 planes: body, head, food."""
+        obs = np.zeros((self.n, 3, self.cells), dtype=np.uint8)
+        obs[:, 0] = self.occupancy != 0
+        obs[self.rows, 1, self.head] = 1
+        obs[self.rows, 2, self.food] = 1
+        return obs.reshape(self.n, 3, self.height, self.width)
+
+
+if __name__ == "__main__":
+    # Benchmark: python snake_batch.py [boards] [steps]
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    env = BatchSnake(n, seed=0)
+    rng = np.random.default_rng(1)
+    start = time.perf_counter()
+    food = deaths = 0
+    for _ in range(steps):
+        obs, rewards, dones = env.step(rng.integers(0, 5, size=n))
+        food += int((rewards > 0).sum())
+        deaths += int(dones.sum())
+    elapsed = time.perf_counter() - start
+    print(f"{n} boards x {steps} steps in {elapsed:.2f}s "
+          f"({n * steps / elapsed:,.0f} board-steps/sec), {food} food eaten, {deaths} games ended")
@@ -1,7 +1,11 @@
+import argparse
 import pygame
 import random
 import sys
 
+from snake_autopilot import Autopilot
+from snake_core import SnakeBody
+
 # Initialize Pygame
 pygame.init()
 
@@ -22,10 +26,13 @@ GREEN = (0, 255, 0)
 class Snake:
     def __init__(self):
         self.length = 1
-        self.positions = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
+        # Deque body plus occupancy grid: O(1) moves and collision checks
+        self.positions = SnakeBody(GRID_WIDTH, GRID_HEIGHT, (GRID_WIDTH // 2, GRID_HEIGHT // 2))
         self.direction = random.choice([UP, DOWN, LEFT, RIGHT])
         self.color = GREEN
         self.score = 0
+        # Tail cells vacated by the last update, for the renderer
+        self.removed = []
 
     def get_head_position(self):
         return self.positions[0]
@@ -34,18 +41,18 @@ class Snake:
         cur = self.get_head_position()
         x, y = self.direction
         new = ((cur[0] + x) % GRID_WIDTH, (cur[1] + y) % GRID_HEIGHT)
-        if new in self.positions[3:]:
+        if self.positions.hits(new, skip=3):
             return False
-        self.positions.insert(0, new)
-        if len(self.positions) > self.length:
-            self.positions.pop()
+        self.positions.push(new)
+        self.removed = self.positions.trim(self.length)
         return True
 
     def reset(self):
         self.length = 1
-        self.positions = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
+        self.positions.reset((GRID_WIDTH // 2, GRID_HEIGHT // 2))
         self.direction = random.choice([UP, DOWN, LEFT, RIGHT])
         self.score = 0
+        self.removed = []
 
     def render(self, surface):
         for p in self.positions:
@@ -54,18 +61,91 @@ class Snake:
 
 # Food class
 class Food:
-    def __init__(self):
+    def __init__(self, snake):
+        self.snake = snake
         self.position = (0, 0)
         self.color = RED
         self.randomize_position()
 
     def randomize_position(self):
-        self.position = (random.randint(0, GRID_WIDTH-1), random.randint(0, GRID_HEIGHT-1))
+        # Uniform over the cells the snake doesn't cover, O(1) however full
+        # the board is; None once there are none left
+        self.position = self.snake.positions.random_free_cell()
 
     def render(self, surface):
+        if self.position is None:
+            return
         pygame.draw.rect(surface, self.color,
                         (self.position[0] * GRID_SIZE, self.position[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE))
 
+# Renderer: the snake and food live on a persistent board surface, and each
+# frame only the cells that changed (new head, vacated tail, food) and the
+# score are repainted and passed to pygame.display.update, so a long snake
+# costs the same per frame as a short one
+class Renderer:
+    def __init__(self, screen, font):
+        self.screen = screen
+        self.font = font
+        self.board = pygame.Surface(screen.get_size()).convert()
+        self.invalidate()
+
+    def invalidate(self):
+        # Full repaint on the next draw (after resets and the win screen)
+        self.full_redraw = True
+
+    def cell_rect(self, cell):
+        return pygame.Rect(cell[0] * GRID_SIZE, cell[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+
+    def draw_score(self, snake):
+        score_text = self.font.render(f'Score: {snake.score}', True, WHITE)
+        self.score_rect = self.screen.blit(score_text, (5, 5))
+        self.score = snake.score
+
+    def redraw(self, snake, food, message):
+        self.board.fill(BLACK)
+        snake.render(self.board)
+        food.render(self.board)
+        self.screen.blit(self.board, (0, 0))
+        self.draw_score(snake)
+        if message:
+            text = self.font.render(message, True, WHITE)
+            self.screen.blit(text, text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)))
+        pygame.display.update()
+        self.head = snake.get_head_position()
+        self.food = food.position
+        self.full_redraw = False
+
+    def draw(self, snake, food, message=None):
+        if self.full_redraw:
+            self.redraw(snake, food, message)
+            return
+
+        dirty = []
+        head = snake.get_head_position()
+        if head != self.head:
+            for cell in snake.removed:
+                dirty.append(self.board.fill(BLACK, self.cell_rect(cell)))
+            dirty.append(self.board.fill(snake.color, self.cell_rect(head)))
+            self.head = head
+        if food.position != self.food:
+            # The old food cell is normally under the new head already
+            if self.food is not None and self.food not in snake.positions:
+                dirty.append(self.board.fill(BLACK, self.cell_rect(self.food)))
+            if food.position is not None:
+                dirty.append(self.board.fill(food.color, self.cell_rect(food.position)))
+            self.food = food.position
+        for rect in dirty:
+            self.screen.blit(self.board, rect, rect)
+
+        # The score sits on top of the board: redraw it when it changes or a
+        # repainted cell overlaps it
+        if snake.score != self.score or self.score_rect.collidelist(dirty) >= 0:
+            dirty.append(self.screen.blit(self.board, self.score_rect, self.score_rect))
+            self.draw_score(snake)
+            dirty.append(self.score_rect)
+        if dirty:
+            pygame.display.update(dirty)
+
 # Directional constants
 UP = (0, -1)
 DOWN = (0, 1)
@@ -73,6 +153,13 @@ LEFT = (-1, 0)
 RIGHT = (1, 0)
 
 def main():
+    parser = argparse.ArgumentParser(description="Snake")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="steer along a Hamiltonian cycle until the board is full")
+    parser.add_argument("--fps", type=int, default=10, help="moves per second")
+    args = parser.parse_args()
+    pilot = Autopilot(GRID_WIDTH, GRID_HEIGHT) if args.autopilot else None
+
     clock = pygame.time.Clock()
     screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
     pygame.display.set_caption('Snake Game')
@@ -80,7 +167,9 @@ def main():
     font = pygame.font.Font(None, 36)
 
     snake = Snake()
-    food = Food()
+    food = Food(snake)
+    renderer = Renderer(screen, font)
+    won = False
 
     while True:
         for event in pygame.event.get():
@@ -99,29 +188,35 @@ def main():
                 elif event.key == pygame.K_q:
                     pygame.quit()
                     sys.exit()
-
-        # Update snake position
-        if not snake.update():
-            snake.reset()
-            food.randomize_position()
-
-        # Check if snake ate the food
-        if snake.get_head_position() == food.position:
-            snake.length += 1
-            snake.score += 1
-            food.randomize_position()
-
-        # Draw everything
-        screen.fill(BLACK)
-        snake.render(screen)
-        food.render(screen)
-        
-        # Draw score
-        score_text = font.render(f'Score: {snake.score}', True, WHITE)
-        screen.blit(score_text, (5, 5))
-
-        pygame.display.update()
-        clock.tick(10)  # Control game speed
+                elif event.key == pygame.K_r and won:
+                    won = False
+                    snake.reset()
+                    food.randomize_position()
+                    renderer.invalidate()
+
+        if not won:
+            if pilot:
+                snake.direction = pilot.next_direction(snake.positions, food.position, snake.length)
+
+            # Update snake position
+            if not snake.update():
+                snake.reset()
+                food.randomize_position()
+                renderer.invalidate()
+
+            # Check if snake ate the food
+            if snake.get_head_position() == food.position:
+                snake.length += 1
+                snake.score += 1
+                food.randomize_position()
+                # No free cell left for food: the snake fills the board
+                won = food.position is None
+                if won:
+                    renderer.invalidate()
+
+        # Draw only what changed since the last frame
+        renderer.draw(snake, food, 'Board full - you win! Press R to play again' if won else None)
+        clock.tick(args.fps)  # Control game speed
 
 if __name__ == '__main__':
     main()
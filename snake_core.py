@@ -0,0 +1,129 @@
+import random
+from array import array
+from collections import deque
+
+# Snake body shared by both snake games: the segments in a deque (head
+# first) plus a per-cell occupancy count over the board, so moving, growing
+# and self-collision checks are all O(1) however long the snake gets.
+
+
+class FreeCells:
+    """Set of cell indices with O(1) add, remove and uniform random pick.
+
+    ``cells[:count]`` holds the members in no particular order and
+    ``index[cell]`` is each cell's slot; removal swaps the last member into
+    the freed slot, so the array never shifts or reallocates.
+    """
+
+    def __init__(self, size):
+        self.cells = array("i", range(size))
+        self.index = array("i", range(size))
+        self.count = size
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, cell):
+        return self.index[cell] < self.count
+
+    def swap(self, cell, slot):
+        other = self.cells[slot]
+        i = self.index[cell]
+        self.cells[i], self.cells[slot] = other, cell
+        self.index[other], self.index[cell] = i, slot
+
+    def remove(self, cell):
+        self.count -= 1
+        self.swap(cell, self.count)
+
+    def add(self, cell):
+        self.swap(cell, self.count)
+        self.count += 1
+
+    def choice(self, rng=random):
+        # Uniform over the members; -1 when empty
+        return self.cells[rng.randrange(self.count)] if self.count else -1
+
+
+class SnakeBody:
+    """Segments as (x, y) grid cells, head first.
+
+    ``push`` adds a new head, ``trim`` drops tail segments down to a length,
+    and ``cell in body`` / ``hits`` answer collision queries from the
+    occupancy grid instead of scanning the body. ``free`` tracks the cells
+    the snake does not cover, for spawning food.
+    """
+
+    def __init__(self, width, height, start):
+        self.width = width
+        self.height = height
+        self.grid = bytearray(width * height)
+        self.free = FreeCells(width * height)
+        self.segments = deque()
+        self.reset(start)
+
+    def reset(self, start):
+        while self.segments:
+            self.pop_tail()
+        self.push(start)
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __iter__(self):
+        return iter(self.segments)
+
+    def __getitem__(self, index):
+        # deque indexing is O(1) near either end, which is all the games use
+        return self.segments[index]
+
+    def __contains__(self, cell):
+        return self.grid[cell[1] * self.width + cell[0]] > 0
+
+    @property
+    def head(self):
+        return self.segments[0]
+
+    @property
+    def tail(self):
+        return self.segments[-1]
+
+    @property
+    def full(self):
+        return not self.free.count
+
+    def push(self, cell):
+        self.segments.appendleft(cell)
+        index = cell[1] * self.width + cell[0]
+        if not self.grid[index]:
+            self.free.remove(index)
+        self.grid[index] += 1
+
+    def pop_tail(self):
+        x, y = cell = self.segments.pop()
+        index = y * self.width + x
+        self.grid[index] -= 1
+        if not self.grid[index]:
+            self.free.add(index)
+        return cell
+
+    def random_free_cell(self, rng=random):
+        # Uniformly random cell not under the snake, or None if the board is full
+        index = self.free.choice(rng)
+        return None if index < 0 else (index % self.width, index // self.width)
+
+    def trim(self, length):
+        # Drop tail segments beyond `length`; returns the cells removed
+        removed = []
+        while len(self.segments) > length:
+            removed.append(self.pop_tail())
+        return removed
+
+    def hits(self, cell, skip=0):
+        # Same as `cell in list(body)[skip:]`: occupied by a segment other
+        # than the first `skip` from the head
+        count = self.grid[cell[1] * self.width + cell[0]]
+        for i in range(min(skip, len(self.segments))):
+            if self.segments[i] == cell:
+                count -= 1
+        return count > 0
@@ -1,6 +1,7 @@
 import pygame
 import time
-import random
+
+from snake_core import SnakeBody
 
 # Initialize pygame
 pygame.init()
@@ -31,15 +32,19 @@ SNAKE_SPEED = 15
 font_style = pygame.font.SysFont("bahnschrift", 25)
 score_font = pygame.font.SysFont("comicsansms", 35)
 
-# Function to display the player's score
+# Function to display the player's score; returns the rect it covers
 def display_score(score):
     value = score_font.render("Your Score: " + str(score), True, YELLOW)
-    window.blit(value, [10, 10])
+    return window.blit(value, [10, 10])
 
-# Function to draw the snake
-def draw_snake(block_size, snake_list):
+# Function to draw the snake (segments are grid cells)
+def draw_snake(block_size, snake_list, surface=window):
     for block in snake_list:
-        pygame.draw.rect(window, GREEN, [block[0], block[1], block_size, block_size])
+        pygame.draw.rect(surface, GREEN, [block[0] * block_size, block[1] * block_size, block_size, block_size])
+
+# Function to paint one grid cell; returns its rect
+def draw_block(surface, color, cell):
+    return surface.fill(color, [cell[0] * BLOCK_SIZE, cell[1] * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE])
 
 # Function to display a message on the screen
 def display_message(msg, color):
@@ -59,18 +64,35 @@ def game_loop():
     x_change = 0
     y_change = 0
 
-    # Snake body
-    snake_list = []
+    # Snake body: grid cells in a deque plus an occupancy grid, so moving
+    # and the self-collision check are O(1) (snake_core.SnakeBody)
+    snake_list = SnakeBody(WIDTH // BLOCK_SIZE, HEIGHT // BLOCK_SIZE,
+                           (int(x) // BLOCK_SIZE, int(y) // BLOCK_SIZE))
     snake_length = 1
-
-    # Food position
-    food_x = round(random.randrange(0, WIDTH - BLOCK_SIZE) / BLOCK_SIZE) * BLOCK_SIZE
-    food_y = round(random.randrange(0, HEIGHT - BLOCK_SIZE) / BLOCK_SIZE) * BLOCK_SIZE
+    game_won = False
+
+    # Food position: a uniformly random cell the snake doesn't cover
+    food_x, food_y = (c * BLOCK_SIZE for c in snake_list.random_free_cell())
+
+    # Incremental drawing: the board surface keeps the snake and food, and
+    # each tick only the changed cells (new head, vacated tail, new food)
+    # and the score are copied to the window and passed to display.update
+    board = pygame.Surface((WIDTH, HEIGHT)).convert()
+    board.fill(BLACK)
+    pygame.draw.rect(board, RED, [food_x, food_y, BLOCK_SIZE, BLOCK_SIZE])
+    draw_snake(BLOCK_SIZE, snake_list, board)
+    window.blit(board, (0, 0))
+    score_rect = display_score(snake_length - 1)
+    drawn_score = snake_length - 1
+    pygame.display.update()
 
     while not game_over:
         while game_close:
             window.fill(BLUE)
-            display_message("You Lost! Press Q-Quit or C-Play Again", RED)
+            if game_won:
+                display_message("Board full, you won! Press Q-Quit or C-Play Again", GREEN)
+            else:
+                display_message("You Lost! Press Q-Quit or C-Play Again", RED)
             display_score(snake_length - 1)
             pygame.display.update()
 
@@ -101,40 +123,49 @@ def game_loop():
                     y_change = BLOCK_SIZE
                     x_change = 0
 
-        # Check for wall collision
-        if x >= WIDTH or x < 0 or y >= HEIGHT or y < 0:
-            game_close = True
-
         # Update snake position
         x += x_change
         y += y_change
-        window.fill(BLACK)
 
-        # Draw food
-        pygame.draw.rect(window, RED, [food_x, food_y, BLOCK_SIZE, BLOCK_SIZE])
+        # Check for wall collision (before the head goes off the grid)
+        if x >= WIDTH or x < 0 or y >= HEIGHT or y < 0:
+            game_close = True
+            continue
 
         # Add new head to the snake
-        snake_head = [x, y]
-        snake_list.append(snake_head)
-        if len(snake_list) > snake_length:
-            del snake_list[0]
+        snake_head = (int(x) // BLOCK_SIZE, int(y) // BLOCK_SIZE)
+        snake_list.push(snake_head)
+        removed = snake_list.trim(snake_length)
 
         # Check for self-collision
-        for block in snake_list[:-1]:
-            if block == snake_head:
-                game_close = True
-
-        # Draw the snake
-        draw_snake(BLOCK_SIZE, snake_list)
-        display_score(snake_length - 1)
+        if snake_list.hits(snake_head, skip=1):
+            game_close = True
 
-        pygame.display.update()
+        # Paint the vacated tail and the new head
+        dirty = [draw_block(board, BLACK, cell) for cell in removed]
+        dirty.append(draw_block(board, GREEN, snake_head))
 
         # Check if snake eats food
         if x == food_x and y == food_y:
-            food_x = round(random.randrange(0, WIDTH - BLOCK_SIZE) / BLOCK_SIZE) * BLOCK_SIZE
-            food_y = round(random.randrange(0, HEIGHT - BLOCK_SIZE) / BLOCK_SIZE) * BLOCK_SIZE
             snake_length += 1
+            food = snake_list.random_free_cell()
+            if food is None:
+                # The snake covers every cell
+                game_won = game_close = True
+            else:
+                food_x, food_y = food[0] * BLOCK_SIZE, food[1] * BLOCK_SIZE
+                dirty.append(draw_block(board, RED, food))
+
+        for rect in dirty:
+            window.blit(board, rect, rect)
+        # The score sits on top of the board: redraw it when it changes or
+        # a repainted cell overlaps it
+        if snake_length - 1 != drawn_score or score_rect.collidelist(dirty) >= 0:
+            dirty.append(window.blit(board, score_rect, score_rect))
+            score_rect = display_score(snake_length - 1)
+            drawn_score = snake_length - 1
+            dirty.append(score_rect)
+        pygame.display.update(dirty)
 
         # Control game speed
         clock.tick(SNAKE_SPEED)
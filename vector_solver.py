@@ -0,0 +1,277 @@
+import argparse
+import heapq
+import math
+import multiprocessing
+import os
+import time
+from array import array
+from collections import deque
+
+# Minimum-move lap solver for the vector-racing rules of
+# vector_wrecker_claude-3-5-sonnet.py: each move adds one of five integer
+# deltas to the velocity, then moves the car by STEP pixels per unit of it.
+#
+# Positions live on a lattice of STEP-pixel cells around the start. A move
+# is legal when every cell on its 8-connected line lies on the track (within
+# half the track width of the centerline) and it doesn't cross the start
+# line backwards; a lap ends with the first move crossing it forwards. A*
+# searches (cell, velocity) states under a heuristic from a breadth-first
+# distance-to-finish field: a car at speed s covers at most s+1, s+2, ...
+# cells in its next moves, so the fewest moves that could add up to the
+# distance never overestimate. Closed states are bits in a bytearray indexed
+# by on-track cell and velocity, over only the speeds the lattice leaves
+# room to reach. A single solve is sequential; independent solves (one per
+# start slot on the line) are spread over a process pool.
+
+STEP = 10  # pixels per unit of velocity (Game._confirm_move)
+DELTAS = ((0, 0), (1, 0), (1, -1), (1, 1), (-1, 0))  # Car.get_move_options
+FINISH = -1
+
+
+def oval_centerline(center, rx, ry, step=10):
+    # The oval vector_wrecker_claude-3-5-sonnet.py's Track generates
+    return [(center[0] + math.cos(math.radians(a)) * rx, center[1] + math.sin(math.radians(a)) * ry)
+            for a in range(0, 360, step)]
+
+
+def distance_to_polyline(point, points):
+    px, py = point
+    best = math.inf
+    for i in range(len(points)):
+        (ax, ay), (bx, by) = points[i - 1], points[i]
+        ex, ey = bx - ax, by - ay
+        length = ex * ex + ey * ey
+        t = 0.0 if not length else max(0.0, min(1.0, ((px - ax) * ex + (py - ay) * ey) / length))
+        best = min(best, math.hypot(ax + t * ex - px, ay + t * ey - py))
+    return best
+
+
+class Racetrack:
+    """The track sampled on the car's position lattice.
+
+    ``centerline`` is a closed polyline, ``start`` a world position on it;
+    the start line is the run of track cells in the start's lattice column
+    that contains the start. ``distance[cell]`` is the fewest 8-connected
+    steps from a cell to crossing that line forwards (-1 if it can't).
+    """
+
+    def __init__(self, centerline, width, start):
+        self.start = start
+        half = width / 2
+        xs = [x for x, y in centerline]
+        ys = [y for x, y in centerline]
+        # Lattice column/row of the start, and the lattice size
+        self.start_col = math.ceil((start[0] - min(xs) + half) / STEP) + 1
+        self.start_row = math.ceil((start[1] - min(ys) + half) / STEP) + 1
+        self.cols = self.start_col + math.ceil((max(xs) + half - start[0]) / STEP) + 2
+        self.rows = self.start_row + math.ceil((max(ys) + half - start[1]) / STEP) + 2
+
+        self.on = bytearray(self.cols * self.rows)
+        for row in range(self.rows):
+            for col in range(self.cols):
+                if distance_to_polyline(self.world((col, row)), centerline) <= half:
+                    self.on[row * self.cols + col] = 1
+        if not self.on[self.start_row * self.cols + self.start_col]:
+            raise ValueError("the start is not on the track")
+        # On-track cells numbered densely, for the visited bitset
+        self.index = array("i", [-1]) * len(self.on)
+        self.track_cells = 0
+        for cell, on in enumerate(self.on):
+            if on:
+                self.index[cell] = self.track_cells
+                self.track_cells += 1
+
+        # The start line: rows of the contiguous run through the start
+        self.line = set()
+        for direction in (1, -1):
+            row = self.start_row if direction == 1 else self.start_row - 1
+            while 0 <= row < self.rows and self.on[row * self.cols + self.start_col]:
+                self.line.add(row)
+                row += direction
+        # Longest monotonic run along either axis, which bounds the speed
+        self.reach = max(self.cols, self.rows)
+        self.build_distance()
+
+    def world(self, cell):
+        return (self.start[0] + (cell[0] - self.start_col) * STEP,
+                self.start[1] + (cell[1] - self.start_row) * STEP)
+
+    def step(self, x, y, nx, ny):
+        # One 8-connected step: None if it leaves the track or crosses the
+        # start line backwards, FINISH if it crosses forwards, else the cell
+        if not (0 <= nx < self.cols and 0 <= ny < self.rows) or not self.on[ny * self.cols + nx]:
+            return None
+        if nx != x:
+            line = self.start_col
+            if nx == line and x == line - 1 and ny in self.line:
+                return FINISH
+            if x == line and nx == line - 1 and y in self.line:
+                return None
+        return ny * self.cols + nx
+
+    def move(self, cell, vx, vy):
+        """Where a move with velocity (vx, vy) from ``cell`` ends: a cell
+        index, FINISH, or None if it crashes."""
+        x, y = cell % self.cols, cell // self.cols
+        n = max(abs(vx), abs(vy))
+        for k in range(1, n + 1):
+            # Nearest lattice point to k/n of the way along
+            nx = x + (2 * vx * k + n) // (2 * n) - (2 * vx * (k - 1) + n) // (2 * n)
+            ny = y + (2 * vy * k + n) // (2 * n) - (2 * vy * (k - 1) + n) // (2 * n)
+            result = self.step(x, y, nx, ny)
+            if result is None or result == FINISH:
+                return result
+            x, y = nx, ny
+        return y * self.cols + x
+
+    def build_distance(self):
+        # Breadth-first from the cells one step short of the line, walking
+        # the same steps backwards
+        self.distance = array("i", [-1]) * len(self.on)
+        queue = deque()
+        for row in self.line:
+            for dy in (-1, 0, 1):
+                x, y = self.start_col - 1, row + dy
+                if 0 <= y < self.rows and self.distance[y * self.cols + x] < 0 \
+                        and self.step(x, y, self.start_col, row) == FINISH:
+                    self.distance[y * self.cols + x] = 1
+                    queue.append((x, y))
+        while queue:
+            x, y = queue.popleft()
+            d = self.distance[y * self.cols + x] + 1
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    px, py = x - dx, y - dy
+                    if (dx or dy) and 0 <= px < self.cols and 0 <= py < self.rows:
+                        cell = py * self.cols + px
+                        if self.distance[cell] < 0 and self.step(px, py, x, y) == y * self.cols + x:
+                            self.distance[cell] = d
+                            queue.append((px, py))
+
+    def heuristic(self, cell, vx, vy):
+        # Fewest moves k with (s+1) + ... + (s+k) >= distance
+        d = self.distance[cell]
+        if d < 0:
+            return None
+        s = max(abs(vx), abs(vy))
+        k = max(0, math.ceil((math.sqrt((2 * s + 1) ** 2 + 8 * d) - (2 * s + 1)) / 2) - 1)
+        while k * s + k * (k + 1) // 2 < d:
+            k += 1
+        return k
+
+    def speed_limit(self, velocity):
+        # A velocity component changes by at most 1 per move, so getting from
+        # speed a up to b along an axis moves the car a+1 + ... + b-1 cells
+        # that way before the move made at b, which may finish the lap
+        a = max(abs(velocity[0]), abs(velocity[1]))
+        budget = self.reach + a * (a + 1) // 2
+        b = a
+        while (b + 1) * b // 2 <= budget:
+            b += 1
+        return b
+
+    def solve(self, cell=None, velocity=(1, 0)):
+        """Fewest-move lap from ``cell`` (default the start) with the given
+        starting velocity: (moves, world positions visited), or None."""
+        if cell is None:
+            cell = self.start_row * self.cols + self.start_col
+        v = self.speed_limit(velocity)
+        width = 2 * v + 1
+        closed = bytearray((self.track_cells * width * width + 7) // 8)
+
+        def key(cell, vx, vy):
+            return (self.index[cell] * width + vx + v) * width + vy + v
+
+        start = (cell, velocity[0], velocity[1])
+        h = self.heuristic(*start)
+        if h is None:
+            return None
+        # Parent of each closed state, for the path
+        parents = {}
+        heap = [(h, 0, start, None)]
+        while heap:
+            _, moves, state, parent = heapq.heappop(heap)
+            k = key(*state)
+            if closed[k >> 3] & (1 << (k & 7)):
+                continue
+            closed[k >> 3] |= 1 << (k & 7)
+            parents[k] = parent
+            cell, vx, vy = state
+            for dx, dy in DELTAS:
+                nvx, nvy = vx + dx, vy + dy
+                if max(abs(nvx), abs(nvy)) > v:
+                    continue
+                end = self.move(cell, nvx, nvy)
+                if end is None:
+                    continue
+                if end == FINISH:
+                    return moves + 1, self.path(parents, k, width) + [self.finish_point(cell, nvx, nvy)]
+                nk = key(end, nvx, nvy)
+                if closed[nk >> 3] & (1 << (nk & 7)):
+                    continue
+                h = self.heuristic(end, nvx, nvy)
+                if h is None:
+                    continue
+                heapq.heappush(heap, (moves + 1 + h, moves + 1, (end, nvx, nvy), k))
+        return None
+
+    def path(self, parents, k, width):
+        # Unpack the chain of closed-set keys back into world positions
+        cells = [c for c, on in enumerate(self.on) if on]
+        points = []
+        while k is not None:
+            points.append(self.world(divmod(cells[k // (width * width)], self.cols)[::-1]))
+            k = parents[k]
+        return points[::-1]
+
+    def finish_point(self, cell, vx, vy):
+        # Where the finishing move would put the car (past the line)
+        return self.world((cell % self.cols + vx, cell // self.cols + vy))
+
+
+def init_worker(centerline, width, start):
+    global worker
+    worker = Racetrack(centerline, width, start)
+
+
+def solve_task(args):
+    return args, worker.solve(*args)
+
+
+def par_laps(centerline, width, start, starts, workers=None):
+    """Solve from several (cell, velocity) starts in parallel; returns
+    {(cell, velocity): (moves, path) or None}."""
+    workers = workers or os.cpu_count() or 1
+    with multiprocessing.Pool(workers, init_worker, (centerline, width, start)) as pool:
+        return dict(pool.imap_unordered(solve_task, starts))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Minimum-move laps of the vector racing oval")
+    parser.add_argument("--scale", type=float, default=1.0, help="scale the oval up by this factor")
+    parser.add_argument("--workers", type=int, help="processes for the per-slot solves")
+    args = parser.parse_args()
+
+    # vector_wrecker_claude-3-5-sonnet.py's 800x600 oval and track width
+    center = (400 * args.scale, 300 * args.scale)
+    centerline = oval_centerline(center, 200 * args.scale, 150 * args.scale)
+    width, start = 60, (center[0], center[1] + 150 * args.scale)
+
+    begin = time.perf_counter()
+    track = Racetrack(centerline, width, start)
+    print(f"{track.cols}x{track.rows} lattice, {track.track_cells} track cells, "
+          f"built in {time.perf_counter() - begin:.2f}s")
+    begin = time.perf_counter()
+    result = track.solve()
+    elapsed = time.perf_counter() - begin
+    print(f"Par from the start: {result[0] if result else 'none'} moves ({elapsed:.2f}s)")
+
+    # Every start slot across the line, from a standstill, on all cores
+    slots = [(row * track.cols + track.start_col, (0, 0)) for row in sorted(track.line)]
+    begin = time.perf_counter()
+    results = par_laps(centerline, width, start, slots, args.workers)
+    elapsed = time.perf_counter() - begin
+    for (cell, velocity), result in sorted(results.items()):
+        print(f"  slot row {cell // track.cols - track.start_row:+d}: "
+              f"{result[0] if result else 'none'} moves")
+    print(f"{len(slots)} slots solved in {elapsed:.2f}s")
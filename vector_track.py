@@ -0,0 +1,157 @@
+import bisect
+import math
+import time
+from array import array
+
+# Track centerline index shared by the vector racers. The centerline is a
+# polyline with the cumulative arc length at every vertex; segments are
+# bucketed in a uniform grid, so projecting a car onto the track looks at a
+# handful of nearby segments instead of the whole track. Lap progress,
+# checkpoints, wrong-way detection and lap timing all come from that one
+# projection (LapTracker).
+
+
+class Centerline:
+    """A track's centerline with arc lengths and a spatial lookup.
+
+    ``project(point)`` returns ``(distance along the line, distance from
+    it)`` for the nearest point of the line within ``radius``, or None when
+    the point is further off. A closed centerline joins its last point back
+    to the first and its arc length wraps around at ``length``.
+    """
+
+    def __init__(self, points, radius, closed=True):
+        self.points = [(float(x), float(y)) for x, y in points]
+        self.radius = radius
+        self.closed = closed
+        n = len(self.points)
+        self.segments = []
+        self.cumulative = array("d", [0.0])
+        for i in range(n if closed else n - 1):
+            (x1, y1), (x2, y2) = self.points[i], self.points[(i + 1) % n]
+            self.segments.append((x1, y1, x2 - x1, y2 - y1))
+            self.cumulative.append(self.cumulative[-1] + math.hypot(x2 - x1, y2 - y1))
+        self.length = self.cumulative[-1]
+
+        # Cells at least `radius` wide: a segment point within `radius` of a
+        # query lies in the query's cell or one of its eight neighbors
+        self.cell = max(radius, 1)
+        self.grid = {}
+        for i, (x, y, dx, dy) in enumerate(self.segments):
+            for cx in range(int(min(x, x + dx) // self.cell), int(max(x, x + dx) // self.cell) + 1):
+                for cy in range(int(min(y, y + dy) // self.cell), int(max(y, y + dy) // self.cell) + 1):
+                    self.grid.setdefault((cx, cy), []).append(i)
+
+    def project(self, point):
+        px, py = point
+        cx, cy = int(px // self.cell), int(py // self.cell)
+        best = None
+        best_d2 = self.radius * self.radius
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for i in self.grid.get((gx, gy), ()):
+                    x, y, dx, dy = self.segments[i]
+                    length2 = dx * dx + dy * dy
+                    t = 0.0 if not length2 else max(0.0, min(1.0, ((px - x) * dx + (py - y) * dy) / length2))
+                    ex, ey = x + t * dx - px, y + t * dy - py
+                    d2 = ex * ex + ey * ey
+                    if d2 <= best_d2:
+                        best, best_d2 = (i, t), d2
+        if best is None:
+            return None
+        i, t = best
+        along = self.cumulative[i] + t * (self.cumulative[i + 1] - self.cumulative[i])
+        return along, math.sqrt(best_d2)
+
+    def point_at(self, along):
+        # Point at an arc distance along the line, by binary search
+        if self.closed:
+            along %= self.length
+        along = max(0.0, min(along, self.length))
+        i = min(bisect.bisect_right(self.cumulative, along) - 1, len(self.segments) - 1)
+        x, y, dx, dy = self.segments[i]
+        span = self.cumulative[i + 1] - self.cumulative[i]
+        t = (along - self.cumulative[i]) / span if span else 0.0
+        return x + t * dx, y + t * dy
+
+
+class LapTracker:
+    """Follows one car along a Centerline, with one update() per move.
+
+    Evenly spaced checkpoints must be crossed in order, each by a forward
+    move shorter than ``max_jump`` (a quarter of the track by default), so
+    turning back or cutting across the infield doesn't count; the last one
+    is the finish (back at the start on a closed track, the far end of an
+    open one).
+    """
+
+    def __init__(self, centerline, checkpoints=8, max_jump=None):
+        self.centerline = centerline
+        length = centerline.length
+        self.checkpoints = [length * (k + 1) / checkpoints for k in range(checkpoints)]
+        self.max_jump = max_jump or length / 4
+        self.laps = 0
+        self.lap_times = []
+        self.lap_moves = []
+        self.reset()
+
+    def reset(self, now=None):
+        # Back to the start of a lap (the lap count and times are kept)
+        self.along = 0.0
+        self.next_checkpoint = 0
+        self.moves = 0
+        self.lap_start = time.perf_counter() if now is None else now
+        self.on_track = True
+        self.wrong_way = False
+
+    def update(self, point, now=None):
+        """Record the car's new position; True if that finished a lap."""
+        self.moves += 1
+        hit = self.centerline.project(point)
+        self.on_track = hit is not None
+        if hit is None:
+            return False
+        along = hit[0]
+        length = self.centerline.length
+        travelled = along - self.along
+        if self.centerline.closed:
+            travelled = (travelled + length / 2) % length - length / 2
+        previous, self.along = self.along, along
+        if travelled:
+            self.wrong_way = travelled < 0
+        if not 0 < travelled <= self.max_jump:
+            return False
+
+        finished = False
+        while True:
+            ahead = self.checkpoints[self.next_checkpoint] - previous
+            if self.centerline.closed:
+                ahead %= length
+            if not 0 < ahead <= travelled:
+                return finished
+            self.next_checkpoint += 1
+            if self.next_checkpoint == len(self.checkpoints):
+                now = time.perf_counter() if now is None else now
+                self.laps += 1
+                self.lap_times.append(now - self.lap_start)
+                self.lap_moves.append(self.moves)
+                self.next_checkpoint = 0
+                self.moves = 0
+                self.lap_start = now
+                finished = True
+
+    @property
+    def progress(self):
+        # Fraction of the lap covered: checkpoints passed, plus the way
+        # toward the next one if the car is between them
+        length = self.centerline.length
+        done = self.checkpoints[self.next_checkpoint - 1] if self.next_checkpoint else 0.0
+        ahead = self.along - done
+        if self.centerline.closed:
+            ahead %= length
+        if not 0 <= ahead <= self.checkpoints[self.next_checkpoint] - done:
+            ahead = 0.0
+        return (done + ahead) / length
+
+    def elapsed(self, now=None):
+        return (time.perf_counter() if now is None else now) - self.lap_start
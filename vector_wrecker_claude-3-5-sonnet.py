@@ -5,6 +5,9 @@ from pygame import Vector2
 from typing import List, Tuple
 import random
 
+from vector_solver import Racetrack
+from vector_track import Centerline, LapTracker
+
 # Initialize Pygame
 pygame.init()
 
@@ -62,6 +65,13 @@ class Track:
     def __init__(self):
         self.boundaries = self._generate_track()
         self.width = TRACK_WIDTH
+        # Start on the centerline, at the bottom of the oval
+        self.start = Vector2(WINDOW_WIDTH/2, WINDOW_HEIGHT/2 + 150)
+        # Laps run the way the car sets off (rightwards along the bottom),
+        # against the order the oval's points were generated in
+        i = min(range(len(self.boundaries)), key=lambda k: self.boundaries[k].distance_to(self.start))
+        self.centerline = Centerline(self.boundaries[i::-1] + self.boundaries[:i:-1], TRACK_WIDTH / 2)
+        self.surface = None  # baked on first draw, once a display exists
 
     def _generate_track(self) -> List[Vector2]:
         # Temporary simple oval track for testing
@@ -74,12 +84,23 @@ class Track:
             points.append(Vector2(x, y))
         return points
 
-    def draw(self, screen):
+    def _bake(self, size):
+        # The 60-pixel stroke is the most expensive thing in a frame, and the
+        # track never changes, so it is drawn once onto a background surface
+        surface = pygame.Surface(size).convert()
+        surface.fill(BLACK)
         # Draw track boundaries
         if len(self.boundaries) > 1:
-            pygame.draw.lines(screen, WHITE, True, self.boundaries, 2)
+            pygame.draw.lines(surface, WHITE, True, self.boundaries, 2)
             # Draw inner track
-            pygame.draw.lines(screen, DARK_GRAY, True, self.boundaries, TRACK_WIDTH)
+            pygame.draw.lines(surface, DARK_GRAY, True, self.boundaries, TRACK_WIDTH)
+        return surface
+
+    def draw(self, screen):
+        # Blitting the baked background also clears the rest of the screen
+        if self.surface is None or self.surface.get_size() != screen.get_size():
+            self.surface = self._bake(screen.get_size())
+        screen.blit(self.surface, (0, 0))
 
 class Game:
     def __init__(self):
@@ -90,8 +111,12 @@ class Game:
         
         # Initialize game objects
         self.track = Track()
-        starting_pos = Vector2(WINDOW_WIDTH/2, WINDOW_HEIGHT-100)
-        self.car = Car(starting_pos)
+        self.car = Car(self.track.start)
+        self.moves = 0
+        self.lap = LapTracker(self.track.centerline)
+        # Fewest moves for a lap from the start (vector_solver.py)
+        result = Racetrack(self.track.boundaries, TRACK_WIDTH, self.track.start).solve()
+        self.par = result[0] if result else None
         
         self.selected_option = 0
         self.game_active = True
@@ -115,12 +140,12 @@ class Game:
         options = self.car.get_move_options()
         self.car.velocity = options[self.selected_option]
         self.car.position += self.car.velocity * 10
+        self.moves += 1
+        self.lap.update(self.car.position)
         self.car.rotation = math.degrees(math.atan2(self.car.velocity.y, self.car.velocity.x))
 
     def draw(self):
-        self.screen.fill(BLACK)
-        
-        # Draw track
+        # Draw track (its baked background covers the whole screen)
         self.track.draw(self.screen)
         
         # Draw car
@@ -139,6 +164,18 @@ class Game:
         font = pygame.font.Font(None, 36)
         text_surface = font.render(speed_text, True, WHITE)
         self.screen.blit(text_surface, (10, 10))
+        moves_text = f"Moves: {self.moves}  Par: {self.par if self.par is not None else '-'}"
+        self.screen.blit(font.render(moves_text, True, WHITE), (10, 40))
+
+        # Lap progress from the centerline
+        lap = self.lap
+        lap_text = f"Lap {lap.laps + 1}: {lap.progress:.0%}  {lap.elapsed():.1f}s"
+        if lap.lap_moves:
+            lap_text += f"  Last: {lap.lap_moves[-1]} moves, {lap.lap_times[-1]:.1f}s"
+        self.screen.blit(font.render(lap_text, True, WHITE), (10, 70))
+        if not lap.on_track or lap.wrong_way:
+            warning = font.render("OFF TRACK" if not lap.on_track else "WRONG WAY", True, RED)
+            self.screen.blit(warning, (WINDOW_WIDTH - warning.get_width() - 10, 10))
 
         pygame.display.flip()
 
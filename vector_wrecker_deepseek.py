@@ -2,6 +2,8 @@ import pygame
 import math
 import random
 
+from vector_track import Centerline, LapTracker
+
 # Initialize pygame
 pygame.init()
 
@@ -43,7 +45,8 @@ class Track:
     def __init__(self):
         self.width = 60
         self.boundaries = self.generate_track()
-        self.start_line = [(100, HEIGHT // 2 - self.width // 2), (100, HEIGHT // 2 + self.width // 2)]
+        # The track is open: the run ends at its last point
+        self.centerline = Centerline(self.boundaries, self.width / 2, closed=False)
 
     def generate_track(self):
         # Generate a simple track with a straight section and random curves
@@ -63,6 +66,7 @@ class GameState:
         self.selected_option = 0
         self.game_active = True
         self.victory = False
+        self.lap = LapTracker(self.track.centerline)
 
     def calculate_options(self):
         # Calculate 5 possible movement options
@@ -76,15 +80,13 @@ class GameState:
         self.current_options = options
 
     def check_collision(self):
-        # Simple collision check with track boundaries
-        for point in self.track.boundaries:
-            distance = math.hypot(self.car.position[0] - point[0], self.car.position[1] - point[1])
-            if distance > self.track.width // 2:
-                self.game_active = False
+        # Off the track when further than half its width from the centerline
+        if self.track.centerline.project(self.car.position) is None:
+            self.game_active = False
 
     def check_victory(self):
-        # Check if the car has crossed the start line
-        if self.car.position[0] > self.track.start_line[0][0] and abs(self.car.position[1] - HEIGHT // 2) < 10:
+        # Finished once every checkpoint up to the end has been passed in order
+        if self.lap.update(self.car.position):
             self.victory = True
             self.game_active = False
 
@@ -114,6 +116,13 @@ def draw_ui(game_state):
     speed_text = pygame.font.SysFont("sans-serif", 20).render(f"Speed: {speed:.2f}", True, WHITE)
     window.blit(speed_text, (10, 10))
 
+    # Draw progress along the track
+    lap = game_state.lap
+    lap_time = lap.lap_times[-1] if game_state.victory else lap.elapsed()
+    progress = "Finished" if game_state.victory else f"{lap.progress:.0%}"
+    lap_text = f"Progress: {progress}  Time: {lap_time:.1f}s" + ("  WRONG WAY" if lap.wrong_way else "")
+    window.blit(pygame.font.SysFont("sans-serif", 20).render(lap_text, True, WHITE), (10, 30))
+
     # Draw movement options
     for i, option in enumerate(game_state.current_options):
         color = YELLOW if i == game_state.selected_option else WHITE
@@ -3,6 +3,8 @@ import math
 import sys
 from typing import List, Tuple
 
+from vector_track import Centerline, LapTracker
+
 # Initialize Pygame
 pygame.init()
 
@@ -25,6 +27,8 @@ YELLOW = (255, 255, 0)
 FPS = 60
 BASE_SPEED = 1.0
 SPEED_MULTIPLIER = 10
+SEGMENT_CELL = 40  # size in pixels of the boundary segment grid cells
+TILE_SIZE = 256  # size in pixels of the baked track tiles
 
 class Car:
     def __init__(self):
@@ -54,7 +58,6 @@ class Track:
         # Create a large oval track
         self.width = TRACK_WIDTH
         self.boundaries = []
-        self.start_line = None
         
         # Outer boundary
         outer_points = []
@@ -88,12 +91,123 @@ class Track:
                 inner_points.append((800 + dx * scale, 300 + dy * scale))
         
         self.boundaries = outer_points + inner_points[::-1]
-        self.start_line = ((200, 300), (200 + TRACK_WIDTH, 300))
+        # Centerline halfway between matching outer and inner points,
+        # starting (and finishing) on the top straight at x=800
+        middle = [((x1 + x2) / 2, (y1 + y2) / 2) for (x1, y1), (x2, y2) in zip(outer_points, inner_points)]
+        start = outer_points.index((800, 100))
+        self.centerline = Centerline(middle[start:] + middle[:start], TRACK_WIDTH / 2)
+        self.start = middle[start]
+        self.build_mask()
+        self.build_segment_grid()
+
+    def build_mask(self):
+        # Rasterize the track polygon once into one byte per pixel, so
+        # contains() is a single lookup however detailed the boundary is.
+        # Each row is filled between its edge crossings with the same
+        # even-odd rule the ray-casting test used.
+        xs = [x for x, y in self.boundaries]
+        ys = [y for x, y in self.boundaries]
+        self.mask_x = math.floor(min(xs))
+        self.mask_y = math.floor(min(ys))
+        self.mask_width = math.ceil(max(xs)) - self.mask_x + 1
+        self.mask_height = math.ceil(max(ys)) - self.mask_y + 1
+        self.mask = bytearray(self.mask_width * self.mask_height)
+
+        n = len(self.boundaries)
+        edges = []
+        for i in range(n):
+            x1, y1 = self.boundaries[i]
+            x2, y2 = self.boundaries[(i + 1) % n]
+            if y1 != y2:  # horizontal edges never cross a ray
+                edges.append((x1, y1, x2, y2))
+
+        last = self.mask_width - 1
+        for row in range(self.mask_height):
+            y = self.mask_y + row
+            crossings = sorted((y - y1) * (x2 - x1) / (y2 - y1) + x1 - self.mask_x
+                               for x1, y1, x2, y2 in edges if min(y1, y2) < y <= max(y1, y2))
+            # A pixel is inside when an odd number of crossings lie at or
+            # to the right of it
+            start = row * self.mask_width
+            for j in range(len(crossings) - 1, -1, -2):
+                lo = math.floor(crossings[j - 1]) + 1 if j else 0
+                hi = min(math.floor(crossings[j]), last)
+                if hi >= lo:
+                    self.mask[start + lo:start + hi + 1] = b"\x01" * (hi - lo + 1)
+
+    def contains(self, point):
+        col = round(point[0]) - self.mask_x
+        row = round(point[1]) - self.mask_y
+        return (0 <= col < self.mask_width and 0 <= row < self.mask_height
+                and self.mask[row * self.mask_width + col] == 1)
+
+    def build_segment_grid(self):
+        # Bucket every boundary segment into each grid cell its bounding box
+        # touches, so a swept query only tests the segments along its path
+        self.segments = []
+        self.segment_grid = {}
+        n = len(self.boundaries)
+        for i in range(n):
+            (x1, y1), (x2, y2) = self.boundaries[i], self.boundaries[(i + 1) % n]
+            self.segments.append((x1, y1, x2 - x1, y2 - y1))
+            for cx in range(int(min(x1, x2) // SEGMENT_CELL), int(max(x1, x2) // SEGMENT_CELL) + 1):
+                for cy in range(int(min(y1, y2) // SEGMENT_CELL), int(max(y1, y2) // SEGMENT_CELL) + 1):
+                    self.segment_grid.setdefault((cx, cy), []).append(i)
+
+    def segment_hit(self, i, x, y, dx, dy):
+        # Fraction t along the move (x, y) + t * (dx, dy) where it crosses
+        # segment i, or None if it doesn't
+        ax, ay, ex, ey = self.segments[i]
+        denom = dx * ey - dy * ex
+        if denom == 0:
+            return None
+        wx, wy = ax - x, ay - y
+        t = (wx * ey - wy * ex) / denom
+        u = (wx * dy - wy * dx) / denom
+        return t if 0 <= t <= 1 and 0 <= u <= 1 else None
+
+    def first_hit(self, start, end):
+        """First boundary crossing on the move from start to end, as the
+        fraction of the move travelled before it, or None."""
+        x, y = start
+        dx, dy = end[0] - x, end[1] - y
+        cx, cy = int(x // SEGMENT_CELL), int(y // SEGMENT_CELL)
+
+        # Visit the grid cells under the move in order (Amanatides-Woo): the
+        # t at which the move crosses the next column and row boundaries
+        step_x, step_y = (1 if dx > 0 else -1), (1 if dy > 0 else -1)
+        next_x = ((cx + (dx > 0)) * SEGMENT_CELL - x) / dx if dx else math.inf
+        next_y = ((cy + (dy > 0)) * SEGMENT_CELL - y) / dy if dy else math.inf
+        delta_x = SEGMENT_CELL / abs(dx) if dx else math.inf
+        delta_y = SEGMENT_CELL / abs(dy) if dy else math.inf
+
+        best = None
+        tested = set()
+        while True:
+            for i in self.segment_grid.get((cx, cy), ()):
+                if i not in tested:
+                    tested.add(i)
+                    t = self.segment_hit(i, x, y, dx, dy)
+                    if t is not None and (best is None or t < best):
+                        best = t
+            # Done once the move ends, or a hit comes before any later cell
+            leave = min(next_x, next_y)
+            if leave > 1 or (best is not None and best <= leave):
+                return best
+            if next_x < next_y:
+                cx += step_x
+                next_x += delta_x
+            else:
+                cy += step_y
+                next_y += delta_y
 
 class GameState:
-    def __init__(self):
+    def __init__(self, track=None):
         self.car = Car()
-        self.track = Track()
+        # A restart can reuse the track and its precomputed lookups
+        self.track = track or Track()
+        self.car.position = list(self.track.start)
+        self.lap = LapTracker(self.track.centerline)
         self.current_options = []
         self.selected_option = 0
         self.game_active = True
@@ -117,6 +231,7 @@ class GameState:
             return
         
         # Update car position
+        old_points = self.car.get_points()
         self.car.position[0] += self.car.velocity[0]
         self.car.position[1] += self.car.velocity[1]
         
@@ -124,6 +239,14 @@ class GameState:
         if self.car.velocity[0] != 0 or self.car.velocity[1] != 0:
             self.car.rotation = math.degrees(math.atan2(-self.car.velocity[1], self.car.velocity[0]))
         
+        # Swept test first, so a fast car can't jump over a boundary
+        # between frames: stop it where a corner first touched the edge
+        hit = self.swept_collision(old_points, self.car.get_points())
+        if hit is not None:
+            self.car.position[0] -= self.car.velocity[0] * (1 - hit)
+            self.car.position[1] -= self.car.velocity[1] * (1 - hit)
+            self.game_active = False
+
         # Check collisions
         if self.check_collision():
             self.game_active = False
@@ -140,41 +263,69 @@ class GameState:
                 return True
         return False
 
+    def swept_collision(self, old_points, new_points):
+        # Trace each corner of the car from where it was to where it is;
+        # returns the earliest boundary hit as a fraction of the move
+        first = None
+        for start, end in zip(old_points, new_points):
+            t = self.track.first_hit(start, end)
+            if t is not None and (first is None or t < first):
+                first = t
+        return first
+
     def point_in_track(self, point):
-        # Simple point-in-polygon check
-        x, y = point
-        n = len(self.track.boundaries)
-        inside = False
-        for i in range(n):
-            x1, y1 = self.track.boundaries[i]
-            x2, y2 = self.track.boundaries[(i+1)%n]
-            if y > min(y1, y2):
-                if y <= max(y1, y2):
-                    if x <= max(x1, x2):
-                        if y1 != y2:
-                            xinters = (y-y1)*(x2-x1)/(y2-y1)+x1
-                        if y1 == y2 or x <= xinters:
-                            inside = not inside
-        return inside
+        # O(1) lookup in the track's rasterized mask (to the nearest pixel)
+        return self.track.contains(point)
 
     def check_victory(self):
-        # Check if car has crossed start line
-        car_front = self.car.get_points()[0]
-        start_line = self.track.start_line
-        return self.lines_intersect(start_line[0], start_line[1], 
-                                  self.car.position, car_front)
-
-    def lines_intersect(self, a1, a2, b1, b2):
-        def ccw(A,B,C):
-            return (C[1]-A[1])*(B[0]-A[0]) > (B[1]-A[1])*(C[0]-A[0])
-        return ccw(a1,b1,b2) != ccw(a2,b1,b2) and ccw(a1,a2,b1) != ccw(a1,a2,b2)
-
-def draw_track(screen, track):
-    pygame.draw.polygon(screen, GRAY, track.boundaries)
-    pygame.draw.lines(screen, WHITE, True, track.boundaries, 2)
-
-def draw_car(screen, car):
-    points = car.get_points()
+        # A lap is done once every checkpoint has been passed in order
+        return self.lap.update(self.car.position)
+
+class TrackView:
+    # Scrolling camera over the track. The track is baked once into
+    # TILE_SIZE-square tiles (fill plus boundary lines) and a frame blits only
+    # the tiles overlapping the window, so drawing costs the same however
+    # large or detailed the circuit is.
+    def __init__(self, track):
+        xs = [x for x, y in track.boundaries]
+        ys = [y for x, y in track.boundaries]
+        # The 2-pixel boundary lines reach a pixel past the polygon
+        self.left, self.top = math.floor(min(xs)) - 2, math.floor(min(ys)) - 2
+        self.right, self.bottom = math.ceil(max(xs)) + 2, math.ceil(max(ys)) + 2
+        self.tiles = {}
+        for ty in range(self.top // TILE_SIZE, self.bottom // TILE_SIZE + 1):
+            for tx in range(self.left // TILE_SIZE, self.right // TILE_SIZE + 1):
+                self.tiles[tx, ty] = self.bake_tile(track, tx, ty)
+
+    def bake_tile(self, track, tx, ty):
+        tile = pygame.Surface((TILE_SIZE, TILE_SIZE)).convert()
+        tile.fill(BLACK)
+        # Whole-pixel vertices, shifted by the same whole amount in every tile
+        points = [(round(x) - tx * TILE_SIZE, round(y) - ty * TILE_SIZE) for x, y in track.boundaries]
+        pygame.draw.polygon(tile, GRAY, points)
+        pygame.draw.lines(tile, WHITE, True, points, 2)
+        return tile
+
+    def camera(self, target):
+        # Top-left world pixel of the window: centered on the target and
+        # clamped to the track's extent
+        x = int(target[0]) - SCREEN_WIDTH // 2
+        y = int(target[1]) - SCREEN_HEIGHT // 2
+        x = max(self.left, min(x, self.right - SCREEN_WIDTH))
+        y = max(self.top, min(y, self.bottom - SCREEN_HEIGHT))
+        return x, y
+
+    def draw(self, screen, camera):
+        cam_x, cam_y = camera
+        screen.fill(BLACK)
+        for ty in range(cam_y // TILE_SIZE, (cam_y + SCREEN_HEIGHT - 1) // TILE_SIZE + 1):
+            for tx in range(cam_x // TILE_SIZE, (cam_x + SCREEN_WIDTH - 1) // TILE_SIZE + 1):
+                tile = self.tiles.get((tx, ty))
+                if tile is not None:
+                    screen.blit(tile, (tx * TILE_SIZE - cam_x, ty * TILE_SIZE - cam_y))
+
+def draw_car(screen, car, camera=(0, 0)):
+    points = [(x - camera[0], y - camera[1]) for x, y in car.get_points()]
     pygame.draw.polygon(screen, GREEN, points)
 
 def draw_ui(screen, game_state):
@@ -182,6 +333,16 @@ def draw_ui(screen, game_state):
     font = pygame.font.SysFont(None, 30)
     speed_text = font.render(f"Speed: {game_state.car.speed:.2f}", True, WHITE)
     screen.blit(speed_text, (10, 10))
+
+    # Lap progress from the centerline
+    lap = game_state.lap
+    lap_time = lap.lap_times[-1] if game_state.victory else lap.elapsed()
+    lap_text = font.render(f"Lap: {lap.progress:.0%}  Checkpoint {lap.next_checkpoint}/{len(lap.checkpoints)}"
+                           f"  Time: {lap_time:.1f}s", True, WHITE)
+    screen.blit(lap_text, (10, 35))
+    if lap.wrong_way and game_state.game_active:
+        text = font.render("WRONG WAY", True, RED)
+        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 10))
     
     # Draw game over/victory screen
     if not game_state.game_active:
@@ -200,6 +361,7 @@ def main():
     clock = pygame.time.Clock()
     
     game_state = GameState()
+    view = TrackView(game_state.track)
     
     while True:
         # Handle events
@@ -234,21 +396,22 @@ def main():
                 
                 if event.key == pygame.K_r:
                     # Restart game
-                    game_state = GameState()
+                    game_state = GameState(game_state.track)
         
         # Update game state
         game_state.update()
         
-        # Draw everything
-        screen.fill(BLACK)
-        draw_track(screen, game_state.track)
-        draw_car(screen, game_state.car)
+        # Draw everything, following the car
+        camera = view.camera(game_state.car.position)
+        view.draw(screen, camera)
+        draw_car(screen, game_state.car, camera)
         
         # Draw movement options
         if game_state.game_active:
             for i, option in enumerate(game_state.current_options):
                 color = YELLOW if i == game_state.selected_option else WHITE
-                start_pos = game_state.car.position
+                start_pos = [game_state.car.position[0] - camera[0],
+                             game_state.car.position[1] - camera[1]]
                 end_pos = [
                     start_pos[0] + option[0] * SPEED_MULTIPLIER,
                     start_pos[1] + option[1] * SPEED_MULTIPLIER